@@ -11,13 +11,22 @@ if backend_path not in sys.path:
 from dotenv import load_dotenv
 load_dotenv()
 
+# Serverless cold start: load scenarios on the first request instead of at import
+os.environ.setdefault("LAZY_INIT", "1")
+
+# Only /tmp is writable on Vercel; point DATABASE_URL at shared storage to keep results
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/primary_sources.db")
+
 # Import the app
 from main import app
-from mangum import Mangum
 
-# Create the handler - Vercel expects this exact variable name
-app_handler = Mangum(app, lifespan="off")
+# Created on first invocation so the Mangum import is not paid at cold start
+app_handler = None
 
 # Vercel entry point
 def handler(event, context):
+    global app_handler
+    if app_handler is None:
+        from mangum import Mangum
+        app_handler = Mangum(app, lifespan="off")
     return app_handler(event, context)
@@ -0,0 +1,207 @@
+"""
+Class-wide analytics over graded results.
+
+ClassAnalytics keeps running aggregates per scenario, per topic and per
+node: result counts, node error rates, score distributions and the most
+common wrong classifications. Each result is folded into the aggregates
+once: every query first catches up on the results stored since the last
+one (an indexed range scan, usually empty), so queries cost the size of
+the summary plus the new results rather than the number of stored
+sessions. Catching up from the store, rather than following this
+process's writes, also counts sessions recorded by other serve.py
+workers.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from results_store import ResultStore
+
+# Score distribution buckets by percentage: 0-9, 10-19, ..., 90-100
+BUCKET_LABELS = [f"{low}-{low + 9}" for low in range(0, 90, 10)] + ["90-100"]
+
+
+class _Aggregate:
+    """Running totals for a scenario or a topic within a scenario."""
+
+    __slots__ = ("results", "score", "max_score", "graded", "errors", "buckets", "label")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.results = 0
+        self.score = 0
+        self.max_score = 0
+        self.graded = 0
+        self.errors = 0
+        self.buckets = [0] * len(BUCKET_LABELS)
+
+    def add(self, score: int, max_score: int, graded: int, errors: int) -> None:
+        self.results += 1
+        self.score += score
+        self.max_score += max_score
+        self.graded += graded
+        self.errors += errors
+        percentage = score / max_score * 100 if max_score > 0 else 0
+        self.buckets[min(int(percentage // 10), len(BUCKET_LABELS) - 1)] += 1
+
+    def summary(self) -> dict:
+        return {
+            "results": self.results,
+            "average_percentage": (
+                round(self.score / self.max_score * 100, 1) if self.max_score else 0
+            ),
+            "error_rate": round(self.errors / self.graded, 4) if self.graded else 0,
+            "score_distribution": dict(zip(BUCKET_LABELS, self.buckets)),
+        }
+
+
+class _NodeAggregate:
+    """Running totals for one node of a scenario."""
+
+    __slots__ = ("graded", "errors", "wrong")
+
+    def __init__(self):
+        self.graded = 0
+        self.errors = 0
+        self.wrong: Counter = Counter()  # (student_answer, correct_answer) -> count
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.graded if self.graded else 0
+
+    def summary(self, node_id: str, top: int) -> dict:
+        return {
+            "node_id": node_id,
+            "graded": self.graded,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "common_mistakes": [
+                {"student_answer": given, "correct_answer": correct, "count": count}
+                for (given, correct), count in self.wrong.most_common(top)
+            ],
+        }
+
+
+class ClassAnalytics:
+    """Incrementally maintained aggregates over every graded result."""
+
+    def __init__(self, store: Optional[ResultStore] = None):
+        self._lock = threading.Lock()
+        self._scenarios: Dict[str, _Aggregate] = {}
+        self._topics: Dict[str, Dict[str, _Aggregate]] = {}
+        self._nodes: Dict[str, Dict[str, _NodeAggregate]] = {}
+        self.sessions = 0
+
+        # Catch-up position in the store: the last result and session folded in
+        self._store = store
+        self._refresh_lock = threading.Lock()
+        self._last_result_id = 0
+        self._last_session_id = 0
+
+    @classmethod
+    def from_store(cls, store: ResultStore) -> "ClassAnalytics":
+        """Build aggregates from the stored history; queries keep them current."""
+        analytics = cls(store)
+        analytics.refresh()
+        return analytics
+
+    def refresh(self) -> None:
+        """
+        Fold in every result stored since the last refresh, by this or any
+        other process. Sessions this process has queued are written first.
+        """
+        if self._store is None:
+            return
+        self._store.flush()
+        with self._refresh_lock:
+            for result in self._store.results_since(self._last_result_id):
+                if result.session_id != self._last_session_id:
+                    with self._lock:
+                        self.sessions += 1
+                    self._last_session_id = result.session_id
+                self.add_result(
+                    result.scenario_id, result.topic_id or result.topic_label, result.topic_label,
+                    result.score, result.max_score, result.grades
+                )
+                self._last_result_id = result.result_id
+
+    def add_result(
+        self,
+        scenario_id: str,
+        topic_key: str,
+        topic_label: str,
+        score: int,
+        max_score: int,
+        grades: Iterable[Tuple[str, str, str, bool]]
+    ) -> None:
+        """Fold one scenario result, given as (node_id, student, correct, is_correct) grades."""
+        with self._lock:
+            nodes = self._nodes.setdefault(scenario_id, {})
+            graded = errors = 0
+            for node_id, student_answer, correct_answer, is_correct in grades:
+                node = nodes.get(node_id)
+                if node is None:
+                    node = nodes[node_id] = _NodeAggregate()
+                node.graded += 1
+                graded += 1
+                if not is_correct:
+                    node.errors += 1
+                    node.wrong[(student_answer, correct_answer)] += 1
+                    errors += 1
+
+            scenario = self._scenarios.get(scenario_id)
+            if scenario is None:
+                scenario = self._scenarios[scenario_id] = _Aggregate()
+            scenario.add(score, max_score, graded, errors)
+
+            topics = self._topics.setdefault(scenario_id, {})
+            topic = topics.get(topic_key)
+            if topic is None:
+                topic = topics[topic_key] = _Aggregate(topic_label)
+            topic.add(score, max_score, graded, errors)
+
+    def overview(self, top: int = 5) -> dict:
+        """Per-scenario summaries with their most-missed nodes."""
+        self.refresh()
+        with self._lock:
+            scenarios = {
+                scenario_id: dict(
+                    aggregate.summary(),
+                    most_missed_nodes=self._most_missed(scenario_id, top)
+                )
+                for scenario_id, aggregate in self._scenarios.items()
+            }
+            return {"sessions": self.sessions, "scenarios": scenarios}
+
+    def scenario_detail(self, scenario_id: str, top: int = 3) -> Optional[dict]:
+        """Topic and node breakdown for one scenario, or None if it has no results."""
+        self.refresh()
+        with self._lock:
+            aggregate = self._scenarios.get(scenario_id)
+            if aggregate is None:
+                return None
+
+            nodes = self._nodes.get(scenario_id, {})
+            return {
+                "scenario_id": scenario_id,
+                **aggregate.summary(),
+                "topics": [
+                    dict(topic.summary(), topic_id=topic_key, topic_label=topic.label)
+                    for topic_key, topic in self._topics.get(scenario_id, {}).items()
+                ],
+                "nodes": [
+                    node.summary(node_id, top)
+                    for node_id, node in sorted(
+                        nodes.items(), key=lambda item: -item[1].error_rate
+                    )
+                ],
+            }
+
+    def _most_missed(self, scenario_id: str, top: int) -> List[dict]:
+        nodes = self._nodes.get(scenario_id, {})
+        worst = sorted(nodes.items(), key=lambda item: -item[1].error_rate)[:top]
+        return [
+            {"node_id": node_id, "error_rate": round(node.error_rate, 4)}
+            for node_id, node in worst
+        ]
@@ -0,0 +1,289 @@
+"""
+Benchmark suite for the grading engine and API endpoints.
+
+Times build_graph, shortest_path_steps, classify_sources, grade_submission
+and get_node_feedback on synthetic scenarios of several sizes, plus
+end-to-end TestClient throughput for /api/scenarios, /api/grade and
+/api/submit-session. Results are written as JSON so runs can be compared;
+with --baseline, any benchmark slower than the baseline by more than
+--threshold, and by more than --noise-floor microseconds, is timed again
+(up to --rounds times, keeping the fastest sample) and fails the run only
+if it stays that slow.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.25
+    python benchmark.py --sizes 10 100 500 --no-api
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+
+from models import Classification, Submission
+from grading import (
+    build_answer_keys, build_graph, classify_sources, get_node_feedback,
+    grade_submission, shortest_path_steps
+)
+from synthetic import generate_synthetic_scenario
+
+JUSTIFICATIONS = [
+    "An eyewitness account written at the time of the event.",
+    "The closest surviving source, since earlier sources no longer exist.",
+    "Written long after the event by a later historian.",
+    "Modern scholarship that analyzes the extant sources.",
+    "It is several transmission steps removed from the event.",
+    "Seems right to me.",
+]
+
+
+def time_call(fn: Callable[[], object], repeat: int = 15, min_time: float = 0.5) -> dict:
+    """
+    Time fn, auto-scaling the loop count so each sample takes at least
+    min_time / repeat seconds.
+
+    Returns:
+        {"median_us": float, "min_us": float, "ops_per_sec": float, "loops": int}
+    """
+    loops = 1
+    target = min_time / repeat
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(target / elapsed) + 1))
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops)
+
+    median = statistics.median(samples)
+    return {
+        "median_us": median * 1e6,
+        "min_us": min(samples) * 1e6,
+        "ops_per_sec": 1 / median if median > 0 else float("inf"),
+        "loops": loops,
+    }
+
+
+def make_classifications(scenario, seed: int = 0) -> List[Classification]:
+    """Deterministic mix of right and wrong answers for every extant node."""
+    rng = random.Random(seed)
+    return [
+        Classification(
+            node_id=node.id,
+            classification=rng.choice(["primary", "secondary", "dependent_on_topic"]),
+            justification=rng.choice(JUSTIFICATIONS),
+        )
+        for node in scenario.nodes if node.extant
+    ]
+
+
+# A benchmark is (function to time, unit printed: "us" or "req/s")
+Cases = Dict[str, tuple]
+
+
+def engine_cases(sizes: List[int]) -> Cases:
+    cases = {}
+    for size in sizes:
+        cases.update(_sized_engine_cases(size))
+    return cases
+
+
+def _sized_engine_cases(size: int) -> Cases:
+    """Engine benchmarks on one synthetic scenario; the closures bind this size's data."""
+    scenario = generate_synthetic_scenario(seed=size, node_count=size, depth=max(3, min(12, size // 8)))
+    topic = scenario.topics[0]
+    graph = build_graph(scenario)
+    answer_key = build_answer_keys(scenario, graph)[topic.id]
+    classifications = make_classifications(scenario)
+    extant_ids = [n.id for n in scenario.nodes if n.extant]
+    sample_node = extant_ids[len(extant_ids) // 2]
+
+    sized = {
+        "build_graph": lambda: build_graph(scenario),
+        "shortest_path_steps": lambda: [shortest_path_steps(graph, topic.anchor, n) for n in extant_ids],
+        "classify_sources": lambda: classify_sources(scenario, topic, graph),
+        "build_answer_keys": lambda: build_answer_keys(scenario, graph),
+        "grade_submission": lambda: grade_submission(
+            scenario, topic, classifications, graph=graph, answer_key=answer_key),
+        "grade_submission_uncached": lambda: grade_submission(scenario, topic, classifications),
+        "get_node_feedback": lambda: get_node_feedback(
+            scenario, sample_node, topic, graph=graph, answer_key=answer_key),
+    }
+    return {f"engine/{name}/n={size}": (fn, "us") for name, fn in sized.items()}
+
+
+@contextmanager
+def api_cases() -> Iterator[Cases]:
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError) as e:
+        print(f"  skipping API benchmarks: {e}", file=sys.stderr)
+        yield {}
+        return
+
+    # Benchmark sessions must never reach the real results store or inboxes
+    scratch = tempfile.TemporaryDirectory(prefix="benchmark-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}/results.db"
+    os.environ["EMAIL_RESULTS"] = "false"
+    import main
+    try:
+        yield _api_cases(TestClient, main)
+    finally:
+        if main.RESULT_STORE is not None:
+            main.RESULT_STORE.close()
+        scratch.cleanup()
+
+
+def _api_cases(TestClient, main) -> Cases:
+
+    client = TestClient(main.app)
+    registry = main.get_registry()
+    scenario = registry.scenarios[0]
+    submission = Submission(
+        scenario_id=scenario.id,
+        topic_id=scenario.topics[0].id,
+        classifications=make_classifications(scenario),
+    ).model_dump(mode="json")
+    graded = client.post("/api/grade", json=submission).json()
+    etag = client.get("/api/scenarios").headers["etag"]
+    session = {"student_name": "Benchmark", "scenario_results": [graded] * len(registry)}
+
+    cases = {
+        "GET /api/scenarios": lambda: client.get("/api/scenarios"),
+        "GET /api/scenarios (304)": lambda: client.get(
+            "/api/scenarios", headers={"If-None-Match": etag}),
+        "POST /api/grade": lambda: client.post("/api/grade", json=submission),
+        "POST /api/submit-session": lambda: client.post("/api/submit-session", json=session),
+    }
+    return {f"api/{name}": (fn, "req/s") for name, fn in cases.items()}
+
+
+def run_cases(cases: Cases, repeat: int) -> Dict[str, dict]:
+    results = {}
+    for key, (fn, unit) in cases.items():
+        results[key] = time_call(fn, repeat=repeat)
+        if unit == "us":
+            print(f"  {key:<48}{results[key]['median_us']:>12.1f} us", file=sys.stderr)
+        else:
+            print(f"  {key:<48}{results[key]['ops_per_sec']:>12.0f} req/s", file=sys.stderr)
+    return results
+
+
+def compare(
+    current: Dict[str, dict],
+    baseline: Dict[str, dict],
+    threshold: float,
+    noise_floor_us: float = 2.0,
+    verbose: bool = True
+) -> List[str]:
+    """
+    Names of benchmarks that regressed by more than threshold.
+
+    Compares the fastest sample rather than the median, which is far less
+    sensitive to scheduler noise on shared machines. A slowdown must also
+    exceed noise_floor_us in absolute terms: for microsecond-scale calls a
+    fraction of a microsecond of jitter is already tens of percent.
+    """
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        regressed = change > threshold and result["min_us"] - before["min_us"] > noise_floor_us
+        if verbose:
+            marker = "REGRESSION" if regressed else ""
+            print(f"  {name:<48}{change:>+10.1%} {marker}", file=sys.stderr)
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the grading engine and API.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200],
+                        help="Synthetic scenario node counts")
+    parser.add_argument("--repeat", type=int, default=15,
+                        help="Timing samples per benchmark; the fastest is compared")
+    parser.add_argument("--no-api", action="store_true", help="Skip TestClient benchmarks")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown vs. baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--noise-floor", type=float, default=2.0,
+                        help="Slowdowns smaller than this many microseconds never fail")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Times a suspected regression is re-timed before it counts")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        print("Engine benchmarks:", file=sys.stderr)
+        cases = engine_cases(args.sizes)
+        results = run_cases(cases, args.repeat)
+        if not args.no_api:
+            print("API benchmarks:", file=sys.stderr)
+            api = stack.enter_context(api_cases())
+            results.update(run_cases(api, args.repeat))
+            cases.update(api)
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+            # Slow phases on a shared machine can outlast a whole timing run,
+            # so a slowdown only counts if it survives being timed again,
+            # with longer and longer pauses in between
+            for attempt in range(args.rounds):
+                suspects = compare(results, baseline, args.threshold, args.noise_floor, verbose=False)
+                if not suspects:
+                    break
+                print(f"Re-timing {len(suspects)} suspected regression(s):", file=sys.stderr)
+                time.sleep(2 ** (attempt + 1))
+                for key, result in run_cases({k: cases[k] for k in suspects}, args.repeat).items():
+                    if result["min_us"] < results[key]["min_us"]:
+                        results[key] = result
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+    if baseline is not None:
+        print(f"Compared with {args.baseline} (threshold {args.threshold:.0%}):", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold, args.noise_floor)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Offline bulk grader for LMS exports.
+
+Streams a JSON Lines file of Submission objects through the grading engine
+using a process pool and writes results as JSONL or CSV without holding the
+whole file in memory.
+
+Usage:
+    python bulk_grade.py submissions.jsonl -o results.jsonl
+    python bulk_grade.py submissions.jsonl --format csv -o results.csv
+    python bulk_grade.py big-scenario-submissions.jsonl --workers 8 -o results.jsonl
+    cat submissions.jsonl | python bulk_grade.py - > results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models import Submission
+from registry import NotFoundError, ScenarioRegistry
+from scenarios import generate_scenarios
+
+CSV_FIELDS = [
+    "line", "student_name", "scenario_id", "topic_label", "score", "max_score",
+    "node_id", "student_answer", "correct_answer", "is_correct", "points", "feedback",
+]
+
+# Per-process registry; inherited from the parent on fork, built otherwise
+_REGISTRY: Optional[ScenarioRegistry] = None
+
+
+def _init_worker() -> None:
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = ScenarioRegistry(generate_scenarios())
+
+
+def _grade_line(item: Tuple[int, str]) -> Tuple[int, Optional[dict], Optional[str]]:
+    """
+    Grade one JSONL line.
+
+    Returns:
+        (line_number, result_dict or None, error message or None)
+    """
+    line_number, line = item
+    try:
+        submission = Submission.model_validate_json(line)
+        result = _REGISTRY.grade(submission)
+    except NotFoundError as e:
+        return line_number, None, str(e)
+    except Exception as e:
+        return line_number, None, f"{type(e).__name__}: {e}"
+
+    record = {"line": line_number, "student_name": submission.student_name}
+    record.update(result.model_dump())
+    return line_number, record, None
+
+
+def _read_lines(stream: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    for line_number, line in enumerate(stream, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _csv_rows(record: dict) -> Iterator[dict]:
+    for grade in record["results"]:
+        yield {
+            "line": record["line"],
+            "student_name": record["student_name"],
+            "scenario_id": record["scenario_id"],
+            "topic_label": record["topic_label"],
+            "score": record["score"],
+            "max_score": record["max_score"],
+            "node_id": grade["node_id"],
+            "student_answer": grade["student_answer"],
+            "correct_answer": grade["correct_answer"],
+            "is_correct": grade["is_correct"],
+            "points": grade["points"],
+            "feedback": grade["feedback"],
+        }
+
+
+def grade_stream(
+    source: Iterable[str],
+    sink,
+    output_format: str = "jsonl",
+    workers: int = 1,
+    chunksize: int = 64
+) -> dict:
+    """
+    Grade every submission line in source and write results to sink.
+
+    Input is consumed in bounded windows, so memory stays constant no
+    matter how long the file is. Lines that fail to parse or grade are
+    reported in the output (JSONL) or on stderr (CSV) and counted.
+
+    Returns:
+        {"lines": int, "graded": int, "errors": int, "seconds": float}
+    """
+    writer = csv.DictWriter(sink, fieldnames=CSV_FIELDS) if output_format == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    stats = {"lines": 0, "graded": 0, "errors": 0}
+    started = time.perf_counter()
+    lines = _read_lines(source)
+    window = max(1, workers) * chunksize * 4
+
+    pool = Pool(workers, initializer=_init_worker) if workers > 1 else None
+    if pool is None:
+        _init_worker()
+
+    try:
+        while True:
+            batch: List[Tuple[int, str]] = list(islice(lines, window))
+            if not batch:
+                break
+
+            graded = pool.imap(_grade_line, batch, chunksize) if pool else map(_grade_line, batch)
+
+            for line_number, record, error in graded:
+                stats["lines"] += 1
+                if error:
+                    stats["errors"] += 1
+                    if writer:
+                        print(f"line {line_number}: {error}", file=sys.stderr)
+                    else:
+                        sink.write(json.dumps({"line": line_number, "error": error}) + "\n")
+                    continue
+
+                stats["graded"] += 1
+                if writer:
+                    writer.writerows(_csv_rows(record))
+                else:
+                    sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Grade a JSONL file of submissions offline.")
+    parser.add_argument("input", help="JSONL file with one Submission per line, or - for stdin")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    # Grading a submission on the bundled scenarios costs less than shipping
+    # it to a worker and back, so extra processes only pay off for large
+    # (e.g. synthetic, hundreds of nodes) scenarios
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (default 1: grade inline)")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="Submissions sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    # Build the registry before forking so workers share it copy-on-write
+    _init_worker()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+
+    try:
+        stats = grade_stream(source, sink, args.format, args.workers, args.chunksize)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    rate = stats["lines"] / stats["seconds"] if stats["seconds"] > 0 else 0
+    print(
+        f"Graded {stats['graded']} submission(s), {stats['errors']} error(s) "
+        f"in {stats['seconds']:.2f}s ({rate:,.0f} submissions/s, {args.workers} worker(s))",
+        file=sys.stderr
+    )
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,106 +1,87 @@
 """
 Email service for sending session results to instructor.
-Uses SendGrid API.
+Uses SendGrid API, directly or through a background MailQueue.
 """
 
 import os
 from datetime import datetime
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
 from models import SessionSubmission, ScenarioResult
+from typing import List
+from mail_queue import DeliveryError, MailQueue, OutgoingEmail, shared_sendgrid_transport
+from reports import (
+    iter_html_digest, render, render_html_report, render_text_report, session_totals
+)
 
 
 def format_session_report(submission: SessionSubmission) -> str:
     """
     Format session results as HTML email.
     """
-    total_score = sum(r.score for r in submission.scenario_results)
-    total_max = sum(r.max_score for r in submission.scenario_results)
-    percentage = round((total_score / total_max * 100), 1) if total_max > 0 else 0
-
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #F6F4F0; padding: 20px; }}
-            .container {{ max-width: 800px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 8px; }}
-            h1 {{ color: #2B2B2B; border-bottom: 3px solid #B2643C; padding-bottom: 10px; }}
-            h2 {{ color: #52796F; margin-top: 25px; }}
-            .summary {{ background-color: #F6F4F0; padding: 15px; border-left: 4px solid #84A98C; margin: 20px 0; }}
-            .score {{ font-size: 24px; font-weight: bold; color: #52796F; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            th {{ background-color: #52796F; color: white; padding: 12px; text-align: left; }}
-            td {{ padding: 10px; border-bottom: 1px solid #C0C7C4; }}
-            tr:nth-child(even) {{ background-color: #F6F4F0; }}
-            .correct {{ color: #84A98C; font-weight: bold; }}
-            .incorrect {{ color: #B2643C; font-weight: bold; }}
-            .footer {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #C0C7C4; color: #8D99AE; font-size: 12px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Primary Source Trainer - Session Results</h1>
-
-            <div class="summary">
-                <p><strong>Student:</strong> {submission.student_name}</p>
-                {f'<p><strong>Email:</strong> {submission.student_email}</p>' if submission.student_email else ''}
-                <p><strong>Completed:</strong> {submission.timestamp.strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p class="score">Overall Score: {total_score}/{total_max} ({percentage}%)</p>
-            </div>
-
-            <h2>Scenario Breakdown</h2>
+    return render_html_report(submission)
+
+
+def format_digest_report(submissions: List[SessionSubmission]) -> str:
+    """
+    Format several sessions as one HTML digest email: an overview table
+    followed by each session's full report.
     """
+    return render(iter_html_digest(submissions))
+
+
+def build_results_email(submission: SessionSubmission, instructor_email: str) -> OutgoingEmail:
+    """
+    Build the results email for one session, addressed to the instructor.
+    """
+    html_content = format_session_report(submission)
+    _, _, percentage = session_totals(submission)
+
+    subject = f"Primary Source Trainer Results - {submission.student_name} ({percentage}%)"
+
+    # Use verified sender email from environment or default to instructor email
+    sender_email = os.getenv("SENDER_EMAIL", instructor_email)
 
-    for i, result in enumerate(submission.scenario_results, 1):
-        scenario_pct = round((result.score / result.max_score * 100), 1) if result.max_score > 0 else 0
-
-        html += f"""
-            <h3>Scenario {i}: {result.scenario_id}</h3>
-            <p><strong>Topic:</strong> {result.topic_label}</p>
-            <p><strong>Score:</strong> {result.score}/{result.max_score} ({scenario_pct}%)</p>
-
-            <table>
-                <tr>
-                    <th>Node</th>
-                    <th>Student Answer</th>
-                    <th>Correct Answer</th>
-                    <th>Points</th>
-                    <th>Result</th>
-                </tr>
-        """
-
-        for grade in result.results:
-            result_class = "correct" if grade.is_correct else "incorrect"
-            result_text = "✓ Correct" if grade.is_correct else "✗ Incorrect"
-
-            html += f"""
-                <tr>
-                    <td>{grade.node_id}</td>
-                    <td>{grade.student_answer}</td>
-                    <td>{grade.correct_answer}</td>
-                    <td>{grade.points}</td>
-                    <td class="{result_class}">{result_text}</td>
-                </tr>
-            """
-
-        html += "</table>"
-
-    html += """
-            <div class="footer">
-                <p>Generated by Primary Source Trainer</p>
-                <p>This is an automated email with student results from the early medieval source classification exercise.</p>
-            </div>
-        </div>
-    </body>
-    </html>
+    # Add reply-to if student provided email
+    reply_to = None
+    if submission.student_email:
+        reply_to = (submission.student_email, submission.student_name)
+
+    return OutgoingEmail(
+        to_email=instructor_email,
+        subject=subject,
+        html=html_content,
+        from_email=sender_email,
+        reply_to=reply_to
+    )
+
+
+def build_digest_email(submissions: List[SessionSubmission], instructor_email: str) -> OutgoingEmail:
     """
+    Build one instructor email covering several sessions.
+    """
+    return OutgoingEmail(
+        to_email=instructor_email,
+        subject=f"Primary Source Trainer Results - digest of {len(submissions)} session(s)",
+        html=format_digest_report(submissions),
+        from_email=os.getenv("SENDER_EMAIL", instructor_email)
+    )
 
-    return html
+
+def queue_results_email(queue: MailQueue, submission: SessionSubmission, instructor_email: str) -> dict:
+    """
+    Queue session results for background delivery to the instructor.
+
+    Returns:
+        {"success": bool, "message": str}
+    """
+    if queue.enqueue(build_results_email(submission, instructor_email)):
+        return {"success": True, "message": f"Results queued for {instructor_email}"}
+    return {"success": False, "message": "Email queue is full; results saved for later delivery"}
 
 
 def send_results_email(submission: SessionSubmission, instructor_email: str) -> dict:
     """
-    Send session results to instructor via SendGrid.
+    Send session results to instructor via SendGrid, synchronously.
+    Request handlers should use queue_results_email instead.
 
     Returns:
         {"success": bool, "message": str}
@@ -114,44 +95,16 @@ def send_results_email(submission: SessionSubmission, instructor_email: str) ->
         }
 
     try:
-        # Format email content
-        html_content = format_session_report(submission)
-
-        total_score = sum(r.score for r in submission.scenario_results)
-        total_max = sum(r.max_score for r in submission.scenario_results)
-        percentage = round((total_score / total_max * 100), 1) if total_max > 0 else 0
-
-        subject = f"Primary Source Trainer Results - {submission.student_name} ({percentage}%)"
-
-        # Create SendGrid message
-        # Use verified sender email from environment or default to instructor email
-        sender_email = os.getenv("SENDER_EMAIL", instructor_email)
-        message = Mail(
-            from_email=Email(sender_email, "Primary Source Trainer"),
-            to_emails=To(instructor_email),
-            subject=subject,
-            html_content=Content("text/html", html_content)
-        )
-
-        # Add reply-to if student provided email
-        if submission.student_email:
-            message.reply_to = Email(submission.student_email, submission.student_name)
-
-        # Send
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
-
-        if response.status_code in [200, 201, 202]:
-            return {
-                "success": True,
-                "message": f"Results sent to {instructor_email}"
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"SendGrid returned status {response.status_code}"
-            }
-
+        shared_sendgrid_transport(api_key).send(build_results_email(submission, instructor_email))
+        return {
+            "success": True,
+            "message": f"Results sent to {instructor_email}"
+        }
+    except DeliveryError as e:
+        return {
+            "success": False,
+            "message": str(e)
+        }
     except Exception as e:
         return {
             "success": False,
@@ -163,39 +116,4 @@ def format_plain_text_report(submission: SessionSubmission) -> str:
     """
     Generate plain text version for students to copy/paste if email fails.
     """
-    total_score = sum(r.score for r in submission.scenario_results)
-    total_max = sum(r.max_score for r in submission.scenario_results)
-    percentage = round((total_score / total_max * 100), 1) if total_max > 0 else 0
-
-    report = f"""
-PRIMARY SOURCE TRAINER - SESSION RESULTS
-{'=' * 60}
-
-Student: {submission.student_name}
-Completed: {submission.timestamp.strftime('%Y-%m-%d %H:%M:%S')}
-Overall Score: {total_score}/{total_max} ({percentage}%)
-
-{'=' * 60}
-SCENARIO BREAKDOWN
-{'=' * 60}
-
-"""
-
-    for i, result in enumerate(submission.scenario_results, 1):
-        scenario_pct = round((result.score / result.max_score * 100), 1) if result.max_score > 0 else 0
-
-        report += f"\nScenario {i}: {result.scenario_id}\n"
-        report += f"Topic: {result.topic_label}\n"
-        report += f"Score: {result.score}/{result.max_score} ({scenario_pct}%)\n"
-        report += f"{'-' * 60}\n"
-
-        for grade in result.results:
-            status = "✓" if grade.is_correct else "✗"
-            report += f"  {status} {grade.node_id}\n"
-            report += f"     Student: {grade.student_answer} | Correct: {grade.correct_answer}\n"
-            report += f"     Points: {grade.points} | {grade.feedback}\n\n"
-
-    report += f"\n{'=' * 60}\n"
-    report += "End of Report\n"
-
-    return report
+    return render_text_report(submission)
@@ -0,0 +1,183 @@
+"""
+Streamed export of every stored session report.
+
+Builds a ZIP or gzipped tar holding, per session, the report as JSON,
+plain text and HTML, plus a summary.csv with one row per session. The
+archive is produced by a generator pipeline (stored sessions -> rendered
+members -> archive bytes), so memory use is bounded by a single report no
+matter how many sessions are exported.
+
+Usage:
+    python export.py -o course-results.zip
+    python export.py --format tar.gz -o course-results.tar.gz
+    python export.py --database-url sqlite:///./primary_sources.db > results.zip
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+from reports import iter_html_report, iter_text_report
+from results_store import ResultStore, open_result_store, submission_from_stored
+
+EXPORT_FORMATS = {
+    # format: (media type, file extension)
+    "zip": ("application/zip", "zip"),
+    "tar.gz": ("application/gzip", "tar.gz"),
+}
+
+SUMMARY_FIELDS = [
+    "verification_code", "student_name", "student_email", "submitted_at",
+    "total_score", "max_score", "percentage", "scenarios_completed",
+]
+
+# Summary rows spill from memory to a temporary file past this size
+SUMMARY_SPOOL_BYTES = 1024 * 1024
+
+# A member is (archive path, chunks of its content)
+Member = Tuple[str, Iterable[bytes]]
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", value).strip("-")[:40] or "student"
+
+
+def _encoded(chunks: Iterable[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def iter_members(sessions: Iterable[dict]) -> Iterator[Member]:
+    """
+    Archive members for stored sessions: three reports per session, then
+    summary.csv once every session has been seen.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SUMMARY_SPOOL_BYTES, mode="w+", newline="") as summary:
+        writer = csv.DictWriter(summary, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+
+        for session in sessions:
+            code = session["verification_code"]
+            folder = f"sessions/{code}-{_slug(session['student_name'])}"
+            submission = submission_from_stored(session)
+
+            yield f"{folder}/report.json", [json.dumps(session, indent=2, ensure_ascii=False).encode("utf-8")]
+            yield f"{folder}/report.txt", _encoded(iter_text_report(submission))
+            yield f"{folder}/report.html", _encoded(iter_html_report(submission))
+
+            row = {field: session[field] for field in SUMMARY_FIELDS if field in session}
+            row["scenarios_completed"] = len(session["scenario_results"])
+            writer.writerow(row)
+
+        summary.seek(0)
+        yield "summary.csv", iter(lambda: summary.read(64 * 1024).encode("utf-8"), b"")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose written bytes are collected for yielding."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(members: Iterable[Member]) -> Iterator[bytes]:
+    """ZIP archive bytes for members, yielded as each member is written."""
+    sink = _ChunkSink()
+    # The sink cannot seek, so zipfile writes sizes in data descriptors
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in members:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w") as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def stream_tar(members: Iterable[Member]) -> Iterator[bytes]:
+    """Gzipped tar archive bytes for members, yielded as each member is written."""
+    sink = _ChunkSink()
+    now = time.time()
+    with tarfile.open(fileobj=sink, mode="w|gz") as archive:
+        for name, chunks in members:
+            # Tar headers need the size up front, so each member is buffered
+            content = b"".join(chunks)
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = now
+            archive.addfile(info, io.BytesIO(content))
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def stream_export(store: ResultStore, export_format: str = "zip") -> Iterator[bytes]:
+    """
+    Archive of every stored session report.
+
+    Raises:
+        ValueError: if export_format is not one of EXPORT_FORMATS
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    store.flush()
+    members = iter_members(store.iter_sessions())
+    if export_format == "zip":
+        return stream_zip(members)
+    return stream_tar(members)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export all stored session reports as an archive.")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="zip")
+    parser.add_argument("--database-url", help="Results store (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    store = open_result_store(args.database_url)
+    started = time.perf_counter()
+    written = 0
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in stream_export(store, args.format):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+        store.close()
+
+    print(f"Wrote {written:,} bytes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
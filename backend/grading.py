@@ -3,128 +3,290 @@ Classification and grading logic based on mediation depth algorithm.
 Implements the shortest-path logic from the PRD.
 """
 
-from typing import Dict, Set, List, Tuple
+from typing import Dict, Set, List, Tuple, Mapping, Optional, FrozenSet
 from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
 from models import Scenario, SourceNode, Topic, Classification, GradingResult
+from justification import JustificationMatcher, get_matcher
 
 
-def build_graph(scenario: Scenario) -> Dict[str, List[str]]:
+INF = float('inf')
+
+
+@dataclass(frozen=True)
+class ScenarioGraph:
     """
-    Build adjacency list from edges.
-    Returns dict mapping node_id -> list of connected node_ids.
+    Compiled, immutable transmission graph for one scenario.
+
+    Node ids are mapped to integer indices and outgoing edges are stored
+    CSR-style: the neighbours of node i are targets[offsets[i]:offsets[i + 1]].
+    depths[i][j] holds the precomputed mediation depth (shortest path length)
+    from node i to node j, or infinity if j is unreachable from i.
+    Built once per scenario and shared by every grading and feedback call.
     """
-    graph = {}
+    node_ids: Tuple[str, ...]
+    index: Mapping[str, int]
+    offsets: Tuple[int, ...]
+    targets: Tuple[int, ...]
+    depths: Tuple[Tuple[float, ...], ...]
+
+    def neighbors(self, i: int) -> Tuple[int, ...]:
+        """Indices of the nodes directly reachable from node index i."""
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def depths_from(self, node_id: str) -> Tuple[float, ...]:
+        """Row of mediation depths from node_id to every node index."""
+        i = self.index.get(node_id)
+        if i is None:
+            return (INF,) * len(self.node_ids)
+        return self.depths[i]
+
+
+def _bfs_depths(offsets: List[int], targets: List[int], source: int) -> Tuple[float, ...]:
+    """Single-source BFS over the CSR arrays, returning depth to every index."""
+    depths = [INF] * (len(offsets) - 1)
+    depths[source] = 0
+    queue = deque([source])
 
-    # Initialize all nodes including event and actual nodes
-    all_ids = {scenario.event.id} | {node.id for node in scenario.nodes}
+    while queue:
+        current = queue.popleft()
+        next_depth = depths[current] + 1
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[k]
+            if depths[neighbor] == INF:
+                depths[neighbor] = next_depth
+                queue.append(neighbor)
 
-    # Also collect any node IDs mentioned in edges (for ghost/lost nodes)
-    for edge in scenario.edges:
-        all_ids.add(edge.from_id)
-        all_ids.add(edge.to)
+    return tuple(depths)
 
-    for node_id in all_ids:
-        graph[node_id] = []
 
-    # Add edges
+def build_graph(scenario: Scenario) -> ScenarioGraph:
+    """
+    Compile the scenario's edges into a ScenarioGraph.
+    Includes the event, all declared nodes and any ghost/lost node ids
+    that only appear in edges. The all-pairs depth matrix is filled with
+    one BFS per node, O(n * (n + e)) in total.
+    """
+    # Event and declared nodes first, then ids only mentioned in edges
+    node_ids = [scenario.event.id]
+    index = {scenario.event.id: 0}
+    for node_id in [node.id for node in scenario.nodes] + [
+        node_id for edge in scenario.edges for node_id in (edge.from_id, edge.to)
+    ]:
+        if node_id not in index:
+            index[node_id] = len(node_ids)
+            node_ids.append(node_id)
+
+    # Bucket edges by source, preserving edge order
+    adjacency: List[List[int]] = [[] for _ in node_ids]
     for edge in scenario.edges:
-        graph[edge.from_id].append(edge.to)
+        adjacency[index[edge.from_id]].append(index[edge.to])
+
+    offsets = [0]
+    targets: List[int] = []
+    for neighbors in adjacency:
+        targets.extend(neighbors)
+        offsets.append(len(targets))
 
-    return graph
+    depths = tuple(_bfs_depths(offsets, targets, i) for i in range(len(node_ids)))
 
+    return ScenarioGraph(
+        node_ids=tuple(node_ids),
+        index=MappingProxyType(index),
+        offsets=tuple(offsets),
+        targets=tuple(targets),
+        depths=depths,
+    )
 
-def shortest_path_steps(graph: Dict[str, List[str]], start: str, end: str) -> int:
+
+def shortest_path_steps(graph: ScenarioGraph, start: str, end: str) -> int:
     """
-    BFS to find shortest path length from start to end.
+    Look up the shortest path length from start to end.
     Returns number of steps, or infinity if unreachable.
     """
     if start == end:
         return 0
 
-    visited = {start}
-    queue = deque([(start, 0)])
-
-    while queue:
-        current, depth = queue.popleft()
-
-        for neighbor in graph.get(current, []):
-            if neighbor == end:
-                return depth + 1
+    end_idx = graph.index.get(end)
+    if end_idx is None:
+        return INF
 
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append((neighbor, depth + 1))
+    return graph.depths_from(start)[end_idx]
 
-    return float('inf')
 
-
-def classify_sources(scenario: Scenario, topic: Topic) -> Tuple[Set[str], Set[str]]:
+def classify_sources(
+    scenario: Scenario,
+    topic: Topic,
+    graph: Optional[ScenarioGraph] = None
+) -> Tuple[Set[str], Set[str]]:
     """
     Classify all extant nodes as primary or secondary for given topic.
 
     A source is PRIMARY if it is the closest EXTANT source along its transmission path.
     A source is SECONDARY if other EXTANT sources are closer to the topic anchor.
 
+    Pass a precompiled graph to avoid rebuilding it from scenario.edges.
+    All depths come from the graph's precomputed matrix, so this is pure
+    table lookups.
+
     Returns:
         (primary_node_ids, secondary_node_ids)
     """
-    graph = build_graph(scenario)
+    if graph is None:
+        graph = build_graph(scenario)
 
-    # Get only extant nodes
-    extant_nodes = [node for node in scenario.nodes if node.extant]
+    # Get only extant nodes, paired with their graph index
+    extant_nodes = [(node.id, graph.index[node.id]) for node in scenario.nodes if node.extant]
 
     if not extant_nodes:
         return set(), set()
 
+    anchor_depths = graph.depths_from(topic.anchor)
+
     # For each extant node, check if there's a CLOSER EXTANT node along any path from the anchor
     primary = set()
     secondary = set()
 
-    for node in extant_nodes:
-        depth_to_node = shortest_path_steps(graph, topic.anchor, node.id)
+    for node_id, i in extant_nodes:
+        depth_to_node = anchor_depths[i]
 
-        if depth_to_node == float('inf'):
+        if depth_to_node == INF:
             continue  # Unreachable
 
         # Check if there's any other extant node that's closer to the anchor
         # AND lies on a path from anchor to this node
         is_closest_extant = True
 
-        for other_node in extant_nodes:
-            if other_node.id == node.id:
+        for other_id, j in extant_nodes:
+            if other_id == node_id:
                 continue
 
-            depth_to_other = shortest_path_steps(graph, topic.anchor, other_node.id)
-            depth_other_to_node = shortest_path_steps(graph, other_node.id, node.id)
+            depth_to_other = anchor_depths[j]
 
             # If other_node is on the path from anchor to node AND is closer to anchor
             # then node is NOT the closest extant
             if (depth_to_other < depth_to_node and
-                depth_to_other + depth_other_to_node == depth_to_node):
+                depth_to_other + graph.depths[j][i] == depth_to_node):
                 is_closest_extant = False
                 break
 
         if is_closest_extant:
-            primary.add(node.id)
+            primary.add(node_id)
         else:
-            secondary.add(node.id)
+            secondary.add(node_id)
 
     return primary, secondary
 
 
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    Precomputed answers for one (scenario, topic) pair.
+
+    topic_dependent holds the extant nodes whose classification differs
+    between the scenario's topics, i.e. the nodes for which a
+    "dependent_on_topic" answer is correct.
+    """
+    primary: FrozenSet[str]
+    secondary: FrozenSet[str]
+    topic_dependent: FrozenSet[str]
+
+
+def _topic_dependent_nodes(
+    scenario: Scenario,
+    splits: List[Tuple[Set[str], Set[str]]]
+) -> FrozenSet[str]:
+    """
+    Find nodes whose classification changes between the scenario's topics,
+    given the (primary, secondary) split for every topic.
+    """
+    if len(scenario.topics) < 2:
+        return frozenset()
+
+    dependent = set()
+    for node in scenario.nodes:
+        classifications = set()
+        for primary, secondary in splits:
+            if node.id in primary:
+                classifications.add("primary")
+            elif node.id in secondary:
+                classifications.add("secondary")
+
+        # If not all the same, it changes with topic
+        if len(classifications) > 1:
+            dependent.add(node.id)
+
+    return frozenset(dependent)
+
+
+def build_answer_keys(
+    scenario: Scenario,
+    graph: Optional[ScenarioGraph] = None
+) -> Dict[str, AnswerKey]:
+    """
+    Classify every topic of a scenario once.
+
+    Returns:
+        dict mapping topic_id -> AnswerKey
+    """
+    if graph is None:
+        graph = build_graph(scenario)
+
+    splits = [classify_sources(scenario, topic, graph) for topic in scenario.topics]
+    topic_dependent = _topic_dependent_nodes(scenario, splits)
+
+    answer_keys = {}
+    for topic, (primary, secondary) in zip(scenario.topics, splits):
+        # Keep the first topic on duplicate ids, matching topic lookup order
+        answer_keys.setdefault(topic.id, AnswerKey(
+            primary=frozenset(primary),
+            secondary=frozenset(secondary),
+            topic_dependent=topic_dependent
+        ))
+
+    return answer_keys
+
+
+def _answer_key_for(scenario: Scenario, topic: Topic, graph: ScenarioGraph) -> AnswerKey:
+    """Build the answer key for a single topic when no precomputed one is given."""
+    primary, secondary = classify_sources(scenario, topic, graph)
+    splits = [classify_sources(scenario, t, graph) for t in scenario.topics]
+    return AnswerKey(
+        primary=frozenset(primary),
+        secondary=frozenset(secondary),
+        topic_dependent=_topic_dependent_nodes(scenario, splits)
+    )
+
+
 def grade_submission(
     scenario: Scenario,
     topic: Topic,
-    classifications: List[Classification]
+    classifications: List[Classification],
+    graph: Optional[ScenarioGraph] = None,
+    answer_key: Optional[AnswerKey] = None,
+    matcher: Optional[JustificationMatcher] = None
 ) -> Tuple[int, int, List[GradingResult]]:
     """
     Grade student's classifications.
 
+    Pass the precompiled graph and answer key for the topic to skip
+    classification entirely; otherwise both are computed here.
+    Justifications are scored with the scenario course's rule set unless
+    a matcher is given.
+
     Returns:
         (score, max_score, grading_results)
     """
+    if graph is None:
+        graph = build_graph(scenario)
+    if answer_key is None:
+        answer_key = _answer_key_for(scenario, topic, graph)
+    if matcher is None:
+        matcher = get_matcher(scenario.course)
+
     # Get correct answers
-    primary_ids, secondary_ids = classify_sources(scenario, topic)
+    primary_ids, secondary_ids = answer_key.primary, answer_key.secondary
 
     # Create lookup for student answers
     student_answers = {c.node_id: c for c in classifications}
@@ -166,7 +328,7 @@ def grade_submission(
         # Handle "dependent_on_topic" - check if topic actually changes classification
         if student_ans == "dependent_on_topic":
             # Check if this node changes between topics
-            is_dependent = len(scenario.topics) > 1 and _node_changes_with_topic(scenario, node.id)
+            is_dependent = len(scenario.topics) > 1 and node.id in answer_key.topic_dependent
             if is_dependent:
                 is_correct = True
                 node_points = 2  # Bonus for recognizing topic dependency
@@ -181,10 +343,9 @@ def grade_submission(
 
             if is_correct:
                 # Provide detailed feedback about WHY it's primary/secondary
-                node_obj = next((n for n in scenario.nodes if n.id == node.id), None)
                 if correct == "primary":
-                    if node_obj and len(node_obj.transmission) > 0:
-                        lost_sources = ", ".join([t.via for t in node_obj.transmission])
+                    if len(node.transmission) > 0:
+                        lost_sources = ", ".join([t.via for t in node.transmission])
                         feedback = f"Correct! This is PRIMARY - it's the closest extant source (based on lost sources: {lost_sources})."
                     else:
                         feedback = f"Correct! This is PRIMARY - it's the closest extant source to the event."
@@ -200,57 +361,17 @@ def grade_submission(
 
         if justification and is_correct:
             # Evaluate if the justification matches the node's actual characteristics
-            graph = build_graph(scenario)
             depth = shortest_path_steps(graph, topic.anchor, node.id)
 
             # Determine what makes this source primary or secondary
             is_primary = node.id in primary_ids
 
-            # Check if justification is semantically correct
-            j_lower = justification.lower()
-
-            if is_primary:
-                # For primary sources, good justifications mention:
-                # - Witness/contemporary/closest
-                # - Timing (at the time, shortly after)
-                # - Based on lost sources (making this the closest extant)
-                if "witness" in j_lower and depth == 1:
-                    justification_points = 2
-                    justification_feedback = " ✓ Excellent reasoning - this is indeed an eyewitness account!"
-                elif "closest" in j_lower or "surviving" in j_lower:
-                    justification_points = 2
-                    justification_feedback = " ✓ Excellent - correctly identified as the closest extant source!"
-                elif ("earlier sources" in j_lower or "no longer exist" in j_lower) and "closest extant" in j_lower:
-                    justification_points = 2
-                    justification_feedback = " ✓ Perfect! This depends on lost sources, making it the closest extant source!"
-                elif ("time of" in j_lower or "shortly after" in j_lower) and node.year <= scenario.event.year + 10:
-                    justification_points = 2
-                    justification_feedback = " ✓ Correct - the timing makes this primary!"
-                else:
-                    justification_points = 1
-                    justification_feedback = " Justification is reasonable but could be more specific about why this is the *closest extant* source."
-
-            else:  # Secondary source
-                # For secondary sources, good justifications mention:
-                # - Written long after (but OTHER extant sources are closer)
-                # - Summarizes/analyzes OTHER EXTANT sources
-                # - Modern scholarship
-                # - Multiple steps removed
-                if "long after" in j_lower and (node.year - scenario.event.year) > 50:
-                    justification_points = 2
-                    justification_feedback = f" ✓ Excellent - written {node.year - scenario.event.year} years after the event, and other extant sources are closer!"
-                elif "modern scholarship" in j_lower or "modern" in j_lower and "analyz" in j_lower:
-                    justification_points = 2
-                    justification_feedback = " ✓ Correct - modern scholarship analyzing other surviving sources!"
-                elif ("summarizes" in j_lower or "analyzes" in j_lower or "compiles" in j_lower or "synthesizes" in j_lower) and ("surviving" in j_lower or "extant" in j_lower or "earlier" in j_lower):
-                    justification_points = 2
-                    justification_feedback = " ✓ Correct - this analyzes/compiles other surviving sources!"
-                elif "multiple steps" in j_lower or "several" in j_lower or "removed from" in j_lower or "transmission steps" in j_lower:
-                    justification_points = 2
-                    justification_feedback = " ✓ Good reasoning about mediation depth!"
-                else:
-                    justification_points = 1
-                    justification_feedback = " Justification is reasonable but could be more specific about why other extant sources are closer to the event."
+            justification_points, justification_feedback = matcher.score(
+                justification,
+                is_primary=is_primary,
+                depth=depth,
+                years_after=node.year - scenario.event.year
+            )
 
         elif justification and not is_correct:
             justification_feedback = " Your reasoning doesn't match this source's actual relationship to the event."
@@ -273,46 +394,39 @@ def grade_submission(
     return score, max_score, results
 
 
-def _node_changes_with_topic(scenario: Scenario, node_id: str) -> bool:
-    """
-    Check if a node's classification changes between different topics.
-    Used to validate "dependent_on_topic" answers.
-    """
-    if len(scenario.topics) < 2:
-        return False
-
-    classifications = []
-    for topic in scenario.topics:
-        primary, secondary = classify_sources(scenario, topic)
-        if node_id in primary:
-            classifications.append("primary")
-        elif node_id in secondary:
-            classifications.append("secondary")
-
-    # If not all the same, it changes with topic
-    return len(set(classifications)) > 1
-
-
-def get_node_feedback(scenario: Scenario, node_id: str, topic: Topic) -> str:
+def get_node_feedback(
+    scenario: Scenario,
+    node_id: str,
+    topic: Topic,
+    graph: Optional[ScenarioGraph] = None,
+    answer_key: Optional[AnswerKey] = None,
+    node: Optional[SourceNode] = None
+) -> str:
     """
     Generate detailed feedback explaining why a node is primary/secondary.
+    Pass the already looked-up node to skip the scan over scenario.nodes.
     """
-    node = next((n for n in scenario.nodes if n.id == node_id), None)
+    if node is None:
+        node = next((n for n in scenario.nodes if n.id == node_id), None)
     if not node:
         return "Node not found."
 
     if not node.extant:
         return f"'{node.title}' is lost and therefore cannot be a primary source."
 
-    graph = build_graph(scenario)
+    if graph is None:
+        graph = build_graph(scenario)
     depth = shortest_path_steps(graph, topic.anchor, node_id)
 
-    primary_ids, _ = classify_sources(scenario, topic)
+    if answer_key is None:
+        primary_ids, _ = classify_sources(scenario, topic, graph)
+    else:
+        primary_ids = answer_key.primary
     is_primary = node_id in primary_ids
 
     feedback = f"**{node.title}** ({node.year} CE)\n\n"
 
-    if depth == float('inf'):
+    if depth == INF:
         feedback += "This source has no documented connection to the event in question."
     elif depth == 0:
         feedback += "This is the event/anchor itself."
@@ -0,0 +1,263 @@
+"""
+Concurrency model for grading.
+
+Small scenarios are graded inline on the request's worker thread (the
+server's thread pool for async handlers), never on the event loop itself.
+Scenarios above GRADING_INLINE_MAX_NODES go to a dedicated executor - a
+pool of GRADING_WORKERS processes, each holding its own compiled
+registry, or a bounded thread pool when GRADING_WORKERS is 0 - so a
+burst of heavy grading never holds the GIL of the process serving page
+loads.
+
+Heavy jobs that are waiting or running are capped at GRADING_MAX_PENDING;
+past that, grade() raises GradingBusyError and the API answers 503 with a
+Retry-After header instead of queueing without bound.
+
+A process pool that loses a worker (OOM kill, crash) is broken for good,
+so it is replaced with a fresh one and the job is retried once; if that
+fails too, the job is answered with GradingBusyError as well.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from metrics import span
+from models import ScenarioResult, Submission
+from registry import (
+    CompiledScenario, NotFoundError, ScenarioRegistry, VersionConflictError, build_registry
+)
+
+# Scenarios with at most this many nodes are graded inline (about 1 ms at 200)
+DEFAULT_INLINE_MAX_NODES = 200
+
+
+class GradingBusyError(Exception):
+    """Raised when too many heavy grading jobs are already pending."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Grading is busy; retry shortly")
+        self.retry_after = retry_after
+
+
+# Registry of a grading worker process, built by _init_worker
+_worker_registry: Optional[ScenarioRegistry] = None
+
+
+def _init_worker() -> None:
+    global _worker_registry
+    _worker_registry = build_registry()
+    _worker_registry.compile_all()
+
+
+def _grade_in_worker(submission: Submission) -> ScenarioResult:
+    """
+    Grade in a worker process. The submission is pinned to the version
+    the parent graded against; a worker still holding an older scenario
+    set rebuilds its registry once and tries again.
+    """
+    global _worker_registry
+    try:
+        return _worker_registry.grade(submission)
+    except (NotFoundError, VersionConflictError):
+        _worker_registry = build_registry(previous=_worker_registry)
+        _worker_registry.compile_all()
+        return _worker_registry.grade(submission)
+
+
+class GradingExecutor:
+    """
+    Routes each submission to inline grading or the heavy-job executor.
+
+    Lookups, version checks and 404s are always resolved inline against
+    the caller's registry, so only valid submissions are handed off.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        threads: int = 2,
+        inline_max_nodes: int = DEFAULT_INLINE_MAX_NODES,
+        max_pending: int = 32,
+        retry_after: int = 1
+    ):
+        self.workers = workers
+        self.inline_max_nodes = inline_max_nodes
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.threads = threads
+        self._executor = self._new_executor()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._inline = 0
+        self._offloaded = 0
+        self._rejected = 0
+        self._restarts = 0
+
+    def _new_executor(self) -> Executor:
+        if self.workers > 0:
+            # Imported here: process pools are opt-in and slow to import
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: the serving process runs threads (store writer, mail
+            # workers) that must not be forked mid-operation
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="grading")
+
+    def _replace_broken(self, broken: Executor) -> None:
+        """Swap in a fresh pool for broken, unless another caller already did."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self._restarts += 1
+        print("Grading pool lost a worker; started a new pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def is_heavy(self, compiled: Optional[CompiledScenario]) -> bool:
+        """True if the scenario is too large to grade inline."""
+        return compiled is not None and len(compiled.scenario.nodes) > self.inline_max_nodes
+
+    def _submit(self, registry: ScenarioRegistry, submission: Submission) -> Tuple[Executor, Future]:
+        """
+        Hand a heavy submission to the executor.
+
+        Returns:
+            (the executor it was submitted to, its future)
+
+        Raises:
+            GradingBusyError: if max_pending jobs are already waiting or running
+            BrokenExecutor: if the process pool is broken
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise GradingBusyError(self.retry_after)
+            self._pending += 1
+            self._offloaded += 1
+
+        executor = self._executor
+        try:
+            if self.workers > 0:
+                compiled = registry.get(submission.scenario_id)
+                pinned = submission.model_copy(update={"scenario_version": compiled.version})
+                future = executor.submit(_grade_in_worker, pinned)
+            else:
+                future = executor.submit(registry.grade, submission)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return executor, future
+
+    def _broken(self, executor: Executor, attempt: int) -> None:
+        """
+        Replace a broken pool; called once per failed attempt.
+
+        Raises:
+            GradingBusyError: if the retry broke the pool as well
+        """
+        self._replace_broken(executor)
+        if attempt > 0:
+            raise GradingBusyError(self.retry_after)
+
+    def _done(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _grade_inline(self, registry: ScenarioRegistry, submission: Submission) -> ScenarioResult:
+        with self._lock:
+            self._inline += 1
+        return registry.grade(submission)
+
+    def _check(self, registry: ScenarioRegistry, submission: Submission) -> None:
+        """Raise NotFoundError/VersionConflictError before handing a job off."""
+        compiled = registry.get(submission.scenario_id)
+        if not compiled:
+            raise NotFoundError("Scenario not found")
+        if submission.scenario_version and submission.scenario_version != compiled.version:
+            raise VersionConflictError("Scenario has changed; reload it and submit again")
+        if not compiled.topic(submission.topic_id):
+            raise NotFoundError("Topic not found")
+
+    async def grade(self, registry: ScenarioRegistry, submission: Submission) -> ScenarioResult:
+        """
+        Grade from a request handler on the event loop. Inline grades and
+        first-use scenario compilation run on the thread pool.
+
+        Raises:
+            NotFoundError, VersionConflictError: as ScenarioRegistry.grade
+            GradingBusyError: if the heavy-job queue is full
+        """
+        compiled = registry.loaded(submission.scenario_id)
+        if compiled is None:
+            compiled = await run_in_threadpool(registry.get, submission.scenario_id)
+        if not self.is_heavy(compiled):
+            return await run_in_threadpool(self._grade_inline, registry, submission)
+
+        self._check(registry, submission)
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                executor, future = self._submit(registry, submission)
+                if self.workers == 0:
+                    return await asyncio.wrap_future(future)
+                # Worker processes report their spans to their own registry
+                with span("grade_submission", submission.scenario_id):
+                    return await asyncio.wrap_future(future)
+            except BrokenExecutor:
+                self._broken(executor, attempt)
+
+    def grade_blocking(self, registry: ScenarioRegistry, submission: Submission) -> ScenarioResult:
+        """grade() for callers running on a worker thread."""
+        if not self.is_heavy(registry.get(submission.scenario_id)):
+            return self._grade_inline(registry, submission)
+
+        self._check(registry, submission)
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                executor, future = self._submit(registry, submission)
+                if self.workers == 0:
+                    return future.result()
+                with span("grade_submission", submission.scenario_id):
+                    return future.result()
+            except BrokenExecutor:
+                self._broken(executor, attempt)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": "processes" if self.workers > 0 else "threads",
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "inline": self._inline,
+                "offloaded": self._offloaded,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def grading_executor_from_env() -> GradingExecutor:
+    """GradingExecutor configured from the GRADING_* environment variables."""
+    return GradingExecutor(
+        workers=int(os.getenv("GRADING_WORKERS", 0)),
+        threads=int(os.getenv("GRADING_THREADS", 2)),
+        inline_max_nodes=int(os.getenv("GRADING_INLINE_MAX_NODES", DEFAULT_INLINE_MAX_NODES)),
+        max_pending=int(os.getenv("GRADING_MAX_PENDING", 32)),
+        retry_after=int(os.getenv("GRADING_RETRY_AFTER", 1))
+    )
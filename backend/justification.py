@@ -0,0 +1,206 @@
+"""
+Justification scoring rules.
+Keyword rules are declared as data and compiled into a single regex, so each
+student justification is scanned exactly once no matter how many rules exist.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class JustificationRule:
+    """
+    One scoring rule for a correctly classified source.
+
+    The rule matches when every group in all_of has at least one keyword
+    present in the justification (case-insensitive substring match) and
+    the optional depth / timing conditions hold. A rule with an empty
+    all_of always matches and serves as the fallback.
+    """
+    all_of: Tuple[Tuple[str, ...], ...]
+    points: int
+    feedback: str  # may use {years_after}
+    depth: Optional[int] = None  # exact mediation depth from the topic anchor
+    min_years_after: Optional[int] = None  # node.year - event.year >= this
+    max_years_after: Optional[int] = None  # node.year - event.year <= this
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Ordered rules for primary and secondary sources; first match wins."""
+    primary: Tuple[JustificationRule, ...]
+    secondary: Tuple[JustificationRule, ...]
+
+
+DEFAULT_RULE_SET = RuleSet(
+    primary=(
+        # Witness/contemporary/closest
+        JustificationRule(
+            all_of=(("witness",),),
+            depth=1,
+            points=2,
+            feedback=" ✓ Excellent reasoning - this is indeed an eyewitness account!",
+        ),
+        JustificationRule(
+            all_of=(("closest", "surviving"),),
+            points=2,
+            feedback=" ✓ Excellent - correctly identified as the closest extant source!",
+        ),
+        # Based on lost sources (making this the closest extant)
+        JustificationRule(
+            all_of=(("earlier sources", "no longer exist"), ("closest extant",)),
+            points=2,
+            feedback=" ✓ Perfect! This depends on lost sources, making it the closest extant source!",
+        ),
+        # Timing (at the time, shortly after)
+        JustificationRule(
+            all_of=(("time of", "shortly after"),),
+            max_years_after=10,
+            points=2,
+            feedback=" ✓ Correct - the timing makes this primary!",
+        ),
+        JustificationRule(
+            all_of=(),
+            points=1,
+            feedback=" Justification is reasonable but could be more specific about why this is the *closest extant* source.",
+        ),
+    ),
+    secondary=(
+        # Written long after (but OTHER extant sources are closer)
+        JustificationRule(
+            all_of=(("long after",),),
+            min_years_after=51,
+            points=2,
+            feedback=" ✓ Excellent - written {years_after} years after the event, and other extant sources are closer!",
+        ),
+        # Modern scholarship
+        JustificationRule(
+            all_of=(("modern scholarship",),),
+            points=2,
+            feedback=" ✓ Correct - modern scholarship analyzing other surviving sources!",
+        ),
+        JustificationRule(
+            all_of=(("modern",), ("analyz",)),
+            points=2,
+            feedback=" ✓ Correct - modern scholarship analyzing other surviving sources!",
+        ),
+        # Summarizes/analyzes OTHER EXTANT sources
+        JustificationRule(
+            all_of=(
+                ("summarizes", "analyzes", "compiles", "synthesizes"),
+                ("surviving", "extant", "earlier"),
+            ),
+            points=2,
+            feedback=" ✓ Correct - this analyzes/compiles other surviving sources!",
+        ),
+        # Multiple steps removed
+        JustificationRule(
+            all_of=(("multiple steps", "several", "removed from", "transmission steps"),),
+            points=2,
+            feedback=" ✓ Good reasoning about mediation depth!",
+        ),
+        JustificationRule(
+            all_of=(),
+            points=1,
+            feedback=" Justification is reasonable but could be more specific about why other extant sources are closer to the event.",
+        ),
+    ),
+)
+
+
+def _normalize_groups(rule: JustificationRule) -> Tuple[FrozenSet[str], ...]:
+    return tuple(frozenset(k.lower() for k in group) for group in rule.all_of)
+
+
+class JustificationMatcher:
+    """
+    A RuleSet compiled into one multi-keyword regex.
+
+    The pattern is a lookahead over all keywords, longest first, so it
+    reports a match at every position where any keyword starts; shorter
+    keywords sharing that start are implied by the longest one. This gives
+    the same overlapping substring semantics as separate `in` checks with a
+    single pass over the text.
+    """
+
+    def __init__(self, rule_set: RuleSet):
+        self.rule_set = rule_set
+
+        keywords = {
+            keyword.lower()
+            for rule in rule_set.primary + rule_set.secondary
+            for group in rule.all_of
+            for keyword in group
+        }
+        ordered = sorted(keywords, key=len, reverse=True)
+
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+            if ordered else None
+        )
+        self._implied: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(k for k in ordered if keyword.startswith(k))
+            for keyword in ordered
+        }
+
+        # Rules paired with their lowercased keyword groups
+        self._primary = [(rule, _normalize_groups(rule)) for rule in rule_set.primary]
+        self._secondary = [(rule, _normalize_groups(rule)) for rule in rule_set.secondary]
+
+    def keywords_in(self, text: str) -> FrozenSet[str]:
+        """All rule keywords occurring anywhere in text (already lowercased)."""
+        if self._pattern is None:
+            return frozenset()
+
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._implied[match.group(1)]
+        return frozenset(found)
+
+    def score(
+        self,
+        justification: str,
+        is_primary: bool,
+        depth: float,
+        years_after: int
+    ) -> Tuple[int, str]:
+        """
+        Score a justification for a correctly classified source.
+
+        Returns:
+            (points, feedback_suffix)
+        """
+        found = self.keywords_in(justification.lower())
+        rules = self._primary if is_primary else self._secondary
+
+        for rule, groups in rules:
+            if rule.depth is not None and depth != rule.depth:
+                continue
+            if rule.min_years_after is not None and years_after < rule.min_years_after:
+                continue
+            if rule.max_years_after is not None and years_after > rule.max_years_after:
+                continue
+            if all(not group.isdisjoint(found) for group in groups):
+                return rule.points, rule.feedback.format(years_after=years_after)
+
+        return 0, ""
+
+
+DEFAULT_MATCHER = JustificationMatcher(DEFAULT_RULE_SET)
+
+# Per-course rule sets, keyed by Scenario.course
+_COURSE_MATCHERS: Dict[str, JustificationMatcher] = {}
+
+
+def register_rule_set(course: str, rule_set: RuleSet) -> None:
+    """Compile and install a rule set for scenarios belonging to course."""
+    _COURSE_MATCHERS[course] = JustificationMatcher(rule_set)
+
+
+def get_matcher(course: Optional[str] = None) -> JustificationMatcher:
+    """Matcher for a course, falling back to the default rules."""
+    if course is None:
+        return DEFAULT_MATCHER
+    return _COURSE_MATCHERS.get(course, DEFAULT_MATCHER)
@@ -0,0 +1,506 @@
+"""
+Background email delivery.
+
+MailQueue hands messages to a pluggable MailTransport from a small pool of
+worker threads, so requests only enqueue. Failed sends are retried with
+exponential backoff; messages that still fail (or fail permanently) are
+written to a dead-letter directory as JSON and can be requeued later.
+
+Transports:
+    SendGridTransport - SendGrid v3 web API over pooled keep-alive connections
+    SMTPTransport     - any SMTP server; for local testing run e.g.
+                        `python -m aiosmtpd -n -l localhost:1025`
+"""
+
+import heapq
+import http.client
+import itertools
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+DEFAULT_DEAD_LETTER_DIR = Path(__file__).parent / "mail_dead_letter"
+
+
+@dataclass(frozen=True)
+class OutgoingEmail:
+    """A transport-independent email."""
+    to_email: str
+    subject: str
+    html: str
+    from_email: str
+    from_name: str = "Primary Source Trainer"
+    reply_to: Optional[Tuple[str, str]] = None  # (email, name)
+    text: Optional[str] = None
+
+
+class DeliveryError(Exception):
+    """A send failed and may succeed if retried."""
+
+
+class PermanentDeliveryError(DeliveryError):
+    """A send failed in a way retrying cannot fix (bad address, rejected key...)."""
+
+
+class MailTransport(ABC):
+    """Delivers one message or raises DeliveryError."""
+
+    @abstractmethod
+    def send(self, message: OutgoingEmail) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class SendGridTransport(MailTransport):
+    """
+    Sends through the SendGrid v3 web API over pooled keep-alive connections.
+
+    Connections are checked out per send and returned afterwards, so
+    concurrent workers each reuse their own connection instead of opening
+    one per email. Share one instance (shared_sendgrid_transport) across
+    everything that sends.
+    """
+
+    HOST = "api.sendgrid.com"
+    PATH = "/v3/mail/send"
+
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        host: str = HOST,
+        connection_class=http.client.HTTPSConnection
+    ):
+        self.api_key = api_key
+        self.host = host
+        self.connection_class = connection_class
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def payload(message: OutgoingEmail) -> dict:
+        """Request body for /v3/mail/send."""
+        content = []
+        if message.text:
+            content.append({"type": "text/plain", "value": message.text})
+        content.append({"type": "text/html", "value": message.html})
+
+        body = {
+            "personalizations": [{"to": [{"email": message.to_email}]}],
+            "from": {"email": message.from_email, "name": message.from_name},
+            "subject": message.subject,
+            "content": content,
+        }
+        if message.reply_to:
+            body["reply_to"] = {"email": message.reply_to[0], "name": message.reply_to[1]}
+        return body
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.connection_class(self.host, timeout=self.timeout)
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def send(self, message: OutgoingEmail) -> None:
+        body = json.dumps(self.payload(message)).encode()
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        # A pooled connection may have been closed by the server; retry once fresh
+        for attempt in range(2):
+            conn = self._checkout()
+            try:
+                conn.request("POST", self.PATH, body=body, headers=headers)
+                response = conn.getresponse()
+                detail = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise DeliveryError(f"SendGrid error: {e}") from e
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        status = response.status
+        if status in (200, 201, 202):
+            return
+        # 4xx other than rate limiting will fail the same way next time
+        if 400 <= status < 500 and status != 429:
+            raise PermanentDeliveryError(f"SendGrid rejected message: {status} {detail[:200]!r}")
+        raise DeliveryError(f"SendGrid returned status {status}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_shared_transports: Dict[str, SendGridTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_sendgrid_transport(api_key: str) -> SendGridTransport:
+    """The process-wide SendGrid transport for api_key, created on first use."""
+    with _shared_lock:
+        transport = _shared_transports.get(api_key)
+        if transport is None:
+            transport = _shared_transports[api_key] = SendGridTransport(api_key)
+        return transport
+
+
+class SMTPTransport(MailTransport):
+    """Sends through an SMTP server, one connection per message."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, message: OutgoingEmail) -> None:
+        email = EmailMessage()
+        email["From"] = f"{message.from_name} <{message.from_email}>"
+        email["To"] = message.to_email
+        email["Subject"] = message.subject
+        if message.reply_to:
+            email["Reply-To"] = f"{message.reply_to[1]} <{message.reply_to[0]}>"
+        email.set_content(message.text or "This message requires an HTML-capable mail client.")
+        email.add_alternative(message.html, subtype="html")
+
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                smtp.send_message(email)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentDeliveryError(f"Recipient refused: {e}") from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f"SMTP error: {e}") from e
+
+
+@dataclass
+class _Job:
+    message: OutgoingEmail
+    attempts: int = 0
+    last_error: str = ""
+
+
+class MailQueue:
+    """
+    Bounded background delivery queue.
+
+    Up to `workers` messages are sent at once. A failed send is retried
+    after base_delay * 2**(attempt - 1) seconds (capped at max_delay, with
+    jitter) until max_attempts, then dead-lettered. Messages waiting for a
+    retry do not occupy a worker.
+    """
+
+    def __init__(
+        self,
+        transport: MailTransport,
+        workers: int = 2,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        maxsize: int = 1000,
+        dead_letter_dir: Optional[Path] = None
+    ):
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.maxsize = maxsize
+        self.dead_letter_dir = Path(dead_letter_dir or DEFAULT_DEAD_LETTER_DIR)
+
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+        # Heap of (due time, sequence, job); sequence keeps FIFO order for ties
+        self._pending: List[Tuple[float, int, _Job]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f"mail-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def enqueue(self, message: OutgoingEmail) -> bool:
+        """
+        Queue a message for delivery.
+
+        Returns:
+            False if the queue is full or closed; the message is dead-lettered
+            instead so it is not lost.
+        """
+        with self._cond:
+            if not self._stopping and len(self._pending) + self._in_flight < self.maxsize:
+                self._push(_Job(message), 0.0)
+                return True
+        self._dead_letter(_Job(message, last_error="queue full"))
+        return False
+
+    def _push(self, job: _Job, delay: float) -> None:
+        heapq.heappush(self._pending, (time.monotonic() + delay, next(self._sequence), job))
+        self._cond.notify()
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                now = time.monotonic()
+                if self._pending and self._pending[0][0] <= now:
+                    self._in_flight += 1
+                    return heapq.heappop(self._pending)[2]
+                timeout = self._pending[0][0] - now if self._pending else None
+                self._cond.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job.attempts += 1
+            try:
+                self.transport.send(job.message)
+            except Exception as e:
+                job.last_error = str(e)
+                permanent = isinstance(e, PermanentDeliveryError)
+                with self._cond:
+                    if not permanent and job.attempts < self.max_attempts and not self._stopping:
+                        self._in_flight -= 1
+                        self.retried += 1
+                        self._push(job, self._backoff(job.attempts))
+                        continue
+                print(f"Email to {job.message.to_email} failed after {job.attempts} attempt(s): {e}")
+                # Still counted in flight until written, so join() sees it
+                self._dead_letter(job)
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+            else:
+                with self._cond:
+                    self._in_flight -= 1
+                    self.sent += 1
+                    self._cond.notify_all()
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _dead_letter(self, job: _Job) -> None:
+        """Write a message that could not be delivered to the dead-letter directory."""
+        record = {
+            "message": asdict(job.message),
+            "attempts": job.attempts,
+            "last_error": job.last_error,
+            "failed_at": datetime.now().isoformat(),
+        }
+        try:
+            self.dead_letter_dir.mkdir(parents=True, exist_ok=True)
+            with self._cond:
+                self.dead_lettered += 1
+            path = self.dead_letter_dir / f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}.json"
+            path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        except OSError as e:
+            print(f"Could not dead-letter email to {job.message.to_email}: {e}")
+
+    def requeue_dead_letters(self) -> int:
+        """
+        Move every dead-lettered message back onto the queue.
+
+        Returns:
+            Number of messages requeued
+        """
+        count = 0
+        for path in sorted(self.dead_letter_dir.glob("*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))["message"]
+            if data.get("reply_to"):
+                data["reply_to"] = tuple(data["reply_to"])
+            path.unlink()
+            if self.enqueue(OutgoingEmail(**data)):
+                count += 1
+        return count
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued": len(self._pending),
+                "in_flight": self._in_flight,
+                "sent": self.sent,
+                "retried": self.retried,
+                "dead_lettered": self.dead_lettered,
+            }
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is queued or in flight; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Give queued messages up to timeout seconds to go out, then stop the
+        workers and dead-letter anything still waiting.
+        """
+        self.join(timeout)
+        with self._cond:
+            self._stopping = True
+            leftovers = [job for _, _, job in self._pending]
+            self._pending.clear()
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+        for job in leftovers:
+            job.last_error = job.last_error or "shutdown before delivery"
+            self._dead_letter(job)
+        self.transport.close()
+
+
+T = TypeVar("T")
+
+
+class DigestBatcher(Generic[T]):
+    """
+    Collects items and enqueues them as one email.
+
+    A digest goes out when max_items have been collected or window seconds
+    after the first item of the batch arrived, whichever comes first (0
+    disables either trigger).
+    """
+
+    def __init__(
+        self,
+        queue: MailQueue,
+        build: Callable[[List[T]], OutgoingEmail],
+        max_items: int = 0,
+        window: float = 0.0
+    ):
+        self.queue = queue
+        self.build = build
+        self.max_items = max_items
+        self.window = window
+        self._items: List[T] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def add(self, item: T) -> None:
+        with self._lock:
+            self._items.append(item)
+            if self.max_items and len(self._items) >= self.max_items:
+                batch = self._take()
+            else:
+                batch = None
+                if self.window and self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            self.queue.enqueue(self.build(batch))
+
+    def _take(self) -> List[T]:
+        batch, self._items = self._items, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def flush(self) -> None:
+        """Enqueue whatever has been collected as one digest now."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self.queue.enqueue(self.build(batch))
+
+    def close(self) -> None:
+        self.flush()
+
+
+def transport_from_env() -> Optional[MailTransport]:
+    """
+    Transport configured by MAIL_TRANSPORT (sendgrid or smtp).
+    Defaults to SendGrid when SENDGRID_API_KEY is set; None when nothing
+    is configured.
+    """
+    kind = os.getenv("MAIL_TRANSPORT", "").lower()
+    if kind == "smtp":
+        return SMTPTransport(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", 25)),
+            username=os.getenv("SMTP_USERNAME") or None,
+            password=os.getenv("SMTP_PASSWORD") or None,
+            starttls=os.getenv("SMTP_STARTTLS", "").lower() in ("1", "true", "yes"),
+        )
+
+    api_key = os.getenv("SENDGRID_API_KEY")
+    if kind in ("", "sendgrid") and api_key:
+        return shared_sendgrid_transport(api_key)
+    return None
+
+
+def mail_queue_from_env() -> Optional[MailQueue]:
+    """A MailQueue over transport_from_env(), sized by MAIL_WORKERS etc."""
+    transport = transport_from_env()
+    if transport is None:
+        return None
+    return MailQueue(
+        transport,
+        workers=int(os.getenv("MAIL_WORKERS", 2)),
+        max_attempts=int(os.getenv("MAIL_MAX_ATTEMPTS", 5)),
+        dead_letter_dir=os.getenv("MAIL_DEAD_LETTER_DIR") or None,
+    )
@@ -3,26 +3,71 @@ FastAPI backend for Primary Source Trainer.
 Main application with API endpoints.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Literal, Optional
+import hmac
 import os
+import threading
 from dotenv import load_dotenv
 
 from models import (
     Scenario, Submission, ScenarioResult, GradingResult,
-    SessionSubmission, Topic
+    SessionSubmission, BatchSubmission, Topic, ProfilerSettings
 )
-from scenarios import generate_scenarios
-from grading import classify_sources, grade_submission, get_node_feedback
+from grading import get_node_feedback
+from registry import (
+    CompiledScenario, NotFoundError, ScenarioRegistry, VersionConflictError, build_registry
+)
+from grading_executor import GradingBusyError, GradingExecutor, grading_executor_from_env
+from payloads import Payload
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render_metrics, span
+from profiler import PROFILER, ProfilerMiddleware
+from reports import REPORT_FORMATS, encode_chunks, render_text_report
+from reloader import ScenarioWatcher, install_sighup_handler
+from scenario_store import scenario_directory
+
+# The results store, analytics, mail and export modules are imported where
+# first used, keeping them (sqlite3, smtplib, zipfile...) off the cold start
+if TYPE_CHECKING:
+    from analytics import ClassAnalytics
+    from mail_queue import DigestBatcher, MailQueue
+    from results_store import ResultStore
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the scenario file watcher when SCENARIO_WATCH_INTERVAL is set."""
+    interval = float(os.getenv("SCENARIO_WATCH_INTERVAL", 0))
+    watcher = None
+    if interval > 0:
+        watcher = ScenarioWatcher(scenario_directory(), reload_scenarios, interval)
+        watcher.start()
+    yield
+    if watcher:
+        watcher.stop()
+    if RESULT_STORE is not None:
+        RESULT_STORE.close()
+    if DIGEST is not None:
+        DIGEST.close()
+    if MAIL_QUEUE is not None:
+        MAIL_QUEUE.close()
+    if GRADING_EXECUTOR is not None:
+        GRADING_EXECUTOR.close()
+
+
 app = FastAPI(
     title="Primary Source Trainer API",
     description="Backend for early medieval source classification training",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend
@@ -39,40 +84,326 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Sampling profiler; idle until enabled through /api/admin/profiler
+app.add_middleware(ProfilerMiddleware)
+
 # In-memory storage for scenarios (could move to database later)
-SCENARIOS: List[Scenario] = generate_scenarios()
+REGISTRY: Optional[ScenarioRegistry] = None
+_registry_lock = threading.Lock()
+
+# Serverless cold starts: defer loading scenarios until the first request
+LAZY_INIT = os.getenv("LAZY_INIT", "").lower() in ("1", "true", "yes")
+
+
+def load_scenarios(registry: ScenarioRegistry) -> None:
+    """
+    Install a scenario registry and everything derived from it.
+    The registry compiles graphs, answer keys and lookup indexes together,
+    so reloading the scenarios always invalidates the cached answers.
+    """
+    global REGISTRY
+    REGISTRY = registry
+
+
+def get_registry() -> ScenarioRegistry:
+    """Current scenario registry, loading it on first use in lazy mode."""
+    registry = REGISTRY
+    if registry is None:
+        with _registry_lock:
+            if REGISTRY is None:
+                load_scenarios(build_registry())
+            registry = REGISTRY
+    return registry
+
+
+def reload_scenarios() -> ScenarioRegistry:
+    """
+    Rebuild the scenario set from the store and swap it in.
+
+    The new registry is fully loaded and compiled before the swap, so an
+    invalid scenario file raises here and the current set keeps serving.
+    Requests already in flight finish against the registry they fetched.
+    """
+    registry = build_registry(previous=REGISTRY).warm_up()
+    with _registry_lock:
+        load_scenarios(registry)
+    print(f"Reloaded {len(registry)} scenario(s)")
+    return registry
+
+
+async def current_registry() -> ScenarioRegistry:
+    """
+    The scenario registry for async endpoints; building it (lazy mode)
+    runs on the thread pool so the event loop never waits on file reads.
+    """
+    registry = REGISTRY
+    if registry is None:
+        registry = await run_in_threadpool(get_registry)
+    return registry
+
+
+async def registry_payload(name: str) -> Payload:
+    """The registry's payload or stats_payload, rendered on the thread pool when cold."""
+    registry = await current_registry()
+    payload = registry.rendered(name)
+    if payload is None:
+        payload = await run_in_threadpool(getattr, registry, name)
+    return payload
+
+
+async def find_scenario(scenario_id: str) -> CompiledScenario:
+    """
+    Look up a compiled scenario or raise 404.
+    Only that scenario is loaded, on the thread pool, if it is not yet compiled.
+    """
+    registry = await current_registry()
+    compiled = registry.loaded(scenario_id)
+    if compiled is None:
+        compiled = await run_in_threadpool(registry.get, scenario_id)
+    if not compiled:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return compiled
+
+
+if not LAZY_INIT:
+    get_registry()
+
+install_sighup_handler(reload_scenarios)
+
+# Graded sessions are persisted here (DATABASE_URL); opened on first use
+RESULT_STORE: Optional["ResultStore"] = None
+_result_store_failed = False
+
+
+def get_result_store() -> Optional["ResultStore"]:
+    """
+    The results store, or None if it could not be opened.
+    A store that fails to open is reported once; reports are still
+    returned to students without being persisted.
+    """
+    global RESULT_STORE, _result_store_failed
+    if RESULT_STORE is None and not _result_store_failed:
+        with _registry_lock:
+            if RESULT_STORE is None and not _result_store_failed:
+                try:
+                    from results_store import open_result_store
+                    RESULT_STORE = open_result_store()
+                except Exception as e:
+                    _result_store_failed = True
+                    print(f"Results store unavailable: {e}")
+    return RESULT_STORE
+
+
+# Running class-wide aggregates, bootstrapped from the store on first use
+# and caught up from it on every query, so they include every worker's
+# sessions. The bootstrap replays the whole results history, so it has its
+# own lock rather than holding up reloads and other lazy initialisation.
+ANALYTICS: Optional["ClassAnalytics"] = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics() -> Optional["ClassAnalytics"]:
+    """Class analytics, or None if the results store is unavailable."""
+    global ANALYTICS
+    if ANALYTICS is None:
+        store = get_result_store()
+        if store is None:
+            return None
+        with _analytics_lock:
+            if ANALYTICS is None:
+                from analytics import ClassAnalytics
+                ANALYTICS = ClassAnalytics.from_store(store)
+    return ANALYTICS
+
+
+# Email each session's results to the instructor from a background queue
+EMAIL_RESULTS = os.getenv("EMAIL_RESULTS", "").lower() in ("1", "true", "yes")
+MAIL_QUEUE: Optional["MailQueue"] = None
+
+# Digest mode: one instructor email per N sessions and/or per time window
+DIGEST_SIZE = int(os.getenv("MAIL_DIGEST_SIZE", 0))
+DIGEST_WINDOW = float(os.getenv("MAIL_DIGEST_WINDOW", 0))
+DIGEST: Optional["DigestBatcher"] = None
+
+
+def get_mail_queue() -> Optional["MailQueue"]:
+    """The delivery queue, or None if no mail transport is configured."""
+    global MAIL_QUEUE
+    if MAIL_QUEUE is None:
+        with _registry_lock:
+            if MAIL_QUEUE is None:
+                from mail_queue import mail_queue_from_env
+                MAIL_QUEUE = mail_queue_from_env()
+    return MAIL_QUEUE
+
+
+def get_digest(queue: "MailQueue") -> Optional["DigestBatcher"]:
+    """The instructor digest batcher, or None when digest mode is off."""
+    global DIGEST
+    if DIGEST is None and (DIGEST_SIZE > 0 or DIGEST_WINDOW > 0):
+        from email_service import build_digest_email
+        from mail_queue import DigestBatcher
+        instructor_email = os.getenv("INSTRUCTOR_EMAIL", "yaniv.fox@biu.ac.il")
+        with _registry_lock:
+            if DIGEST is None:
+                DIGEST = DigestBatcher(
+                    queue,
+                    lambda submissions: build_digest_email(submissions, instructor_email),
+                    max_items=DIGEST_SIZE,
+                    window=DIGEST_WINDOW
+                )
+    return DIGEST
+
+
+def email_session(submission: SessionSubmission, response: dict) -> None:
+    """Queue the results email when EMAIL_RESULTS is on; the request never waits on delivery."""
+    if not EMAIL_RESULTS:
+        return
+    queue = get_mail_queue()
+    if queue is None:
+        response["email"] = {"success": False, "message": "No mail transport configured"}
+        return
+
+    digest = get_digest(queue)
+    if digest is not None:
+        digest.add(submission)
+        response["email"] = {"success": True, "message": "Results will be sent in the next instructor digest"}
+        return
+
+    from email_service import queue_results_email
+    instructor_email = os.getenv("INSTRUCTOR_EMAIL", "yaniv.fox@biu.ac.il")
+    response["email"] = queue_results_email(queue, submission, instructor_email)
+
+
+# Heavy scenarios are graded off the event loop (GRADING_* settings)
+GRADING_EXECUTOR: Optional[GradingExecutor] = None
+
+
+def get_grading_executor() -> GradingExecutor:
+    global GRADING_EXECUTOR
+    if GRADING_EXECUTOR is None:
+        with _registry_lock:
+            if GRADING_EXECUTOR is None:
+                GRADING_EXECUTOR = grading_executor_from_env()
+    return GRADING_EXECUTOR
+
+
+def busy_response(e: GradingBusyError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def store_session(submission: SessionSubmission, response: dict) -> None:
+    """Queue a graded session for the results store."""
+    store = get_result_store()
+    if store is None:
+        return
+    from results_store import SessionRecord
+    try:
+        store.record_session(SessionRecord.from_report(submission, response["report_data"]))
+    except Exception as e:
+        print(f"Error storing session: {e}")
+
+
+def require_admin(request: Request) -> None:
+    """
+    Guard for instructor/admin endpoints.
+    Expects the ADMIN_TOKEN value in an X-Admin-Token header; admin
+    endpoints are disabled entirely when ADMIN_TOKEN is not set.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    provided = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+# Scenarios can be hot-reloaded, so by default clients revalidate on every
+# use (a matching ETag costs a 304); a positive max-age lets them skip that
+CACHE_MAX_AGE = int(os.getenv("SCENARIO_CACHE_MAX_AGE", 0))
+
+
+def cache_headers(etag: str) -> dict:
+    """Caching headers for payloads derived from the scenario set."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}" if CACHE_MAX_AGE > 0 else "no-cache",
+    }
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already matches etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+async def payload_response(request: Request, payload: Payload) -> Response:
+    """
+    Serve a pre-rendered payload as raw bytes.
+    Picks the pre-compressed variant the client accepts and answers 304
+    when If-None-Match already matches that variant's ETag. A variant not
+    compressed yet (lazy mode, first request) is built on the thread pool.
+    """
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if payload.needs_encoding(accept_encoding):
+        body, encoding = await run_in_threadpool(payload.encoded, accept_encoding)
+    else:
+        body, encoding = payload.encoded(accept_encoding)
+    headers = cache_headers(payload.variant_etag(encoding))
+    headers["Vary"] = "Accept-Encoding"
+
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def find_topic(compiled: CompiledScenario, topic_id: str) -> Topic:
+    """Look up a topic of a compiled scenario or raise 404."""
+    topic = compiled.topic(topic_id)
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    return topic
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     """Health check endpoint."""
     return {
         "message": "Primary Source Trainer API",
         "version": "1.0.0",
-        "scenarios_available": len(SCENARIOS)
+        "scenarios_available": len(await current_registry())
     }
 
 
 @app.get("/api/scenarios", response_model=List[Scenario])
-def get_all_scenarios():
+async def get_all_scenarios(request: Request):
     """
     Get all available scenarios.
     Returns list of 10 scenarios for the training session.
+    Served from bytes rendered when the scenarios were loaded.
     """
-    return SCENARIOS
+    return await payload_response(request, await registry_payload("payload"))
 
 
 @app.get("/api/scenario/{scenario_id}", response_model=Scenario)
-def get_scenario(scenario_id: str):
+async def get_scenario(scenario_id: str, request: Request):
     """Get a specific scenario by ID."""
-    scenario = next((s for s in SCENARIOS if s.id == scenario_id), None)
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    return scenario
+    return await payload_response(request, (await find_scenario(scenario_id)).payload)
 
 
 @app.post("/api/grade", response_model=ScenarioResult)
-def grade_scenario(submission: Submission):
+async def grade_scenario(submission: Submission):
     """
     Grade a student's submission for a single scenario.
 
@@ -81,34 +412,18 @@ def grade_scenario(submission: Submission):
         - student_name: Student's name
         - classifications: List of {node_id, classification, justification}
         - topic_id: Which topic was used for classification
+
+    Answers 503 with Retry-After when too many heavy gradings are pending.
     """
+    registry = await current_registry()
     try:
-        # Find scenario
-        scenario = next((s for s in SCENARIOS if s.id == submission.scenario_id), None)
-        if not scenario:
-            raise HTTPException(status_code=404, detail="Scenario not found")
-
-        # Find topic
-        topic = next((t for t in scenario.topics if t.id == submission.topic_id), None)
-        if not topic:
-            raise HTTPException(status_code=404, detail="Topic not found")
-
-        # Grade the submission
-        score, max_score, results = grade_submission(
-            scenario=scenario,
-            topic=topic,
-            classifications=submission.classifications
-        )
-
-        return ScenarioResult(
-            scenario_id=submission.scenario_id,
-            score=score,
-            max_score=max_score,
-            results=results,
-            topic_label=topic.label
-        )
-    except HTTPException:
-        raise
+        return await get_grading_executor().grade(registry, submission)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except GradingBusyError as e:
+        raise busy_response(e)
     except Exception as e:
         print(f"Error grading submission: {e}")
         import traceback
@@ -117,44 +432,45 @@ def grade_scenario(submission: Submission):
 
 
 @app.post("/api/classify/{scenario_id}/{topic_id}")
-def get_classification(scenario_id: str, topic_id: str):
+async def get_classification(scenario_id: str, topic_id: str):
     """
     Get the correct classification for a scenario/topic combo.
     Useful for showing answers after grading.
     """
-    scenario = next((s for s in SCENARIOS if s.id == scenario_id), None)
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
+    compiled = await find_scenario(scenario_id)
+    topic = find_topic(compiled, topic_id)
 
-    topic = next((t for t in scenario.topics if t.id == topic_id), None)
-    if not topic:
-        raise HTTPException(status_code=404, detail="Topic not found")
-
-    primary, secondary = classify_sources(scenario, topic)
+    answer_key = compiled.answer_keys[topic.id]
+    primary, secondary = answer_key.primary, answer_key.secondary
 
     return {
         "scenario_id": scenario_id,
         "topic_id": topic_id,
         "topic_label": topic.label,
+        "scenario_version": compiled.version,
         "primary_sources": list(primary),
         "secondary_sources": list(secondary)
     }
 
 
 @app.get("/api/feedback/{scenario_id}/{node_id}/{topic_id}")
-def get_detailed_feedback(scenario_id: str, node_id: str, topic_id: str):
+async def get_detailed_feedback(scenario_id: str, node_id: str, topic_id: str):
     """
     Get detailed feedback explaining why a node is primary/secondary.
     """
-    scenario = next((s for s in SCENARIOS if s.id == scenario_id), None)
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-
-    topic = next((t for t in scenario.topics if t.id == topic_id), None)
-    if not topic:
-        raise HTTPException(status_code=404, detail="Topic not found")
-
-    feedback = get_node_feedback(scenario, node_id, topic)
+    compiled = await find_scenario(scenario_id)
+    topic = find_topic(compiled, topic_id)
+
+    node = compiled.node(node_id)
+    if not node:
+        feedback = "Node not found."
+    else:
+        feedback = get_node_feedback(
+            compiled.scenario, node_id, topic,
+            graph=compiled.graph,
+            answer_key=compiled.answer_keys[topic.id],
+            node=node
+        )
 
     return {
         "scenario_id": scenario_id,
@@ -164,18 +480,16 @@ def get_detailed_feedback(scenario_id: str, node_id: str, topic_id: str):
     }
 
 
-@app.post("/api/submit-session")
-def submit_session(submission: SessionSubmission):
+def create_session_report(submission: SessionSubmission) -> dict:
     """
-    Submit complete session results and generate downloadable report.
-
-    Request body:
-        - student_name: Student's name
-        - student_email: (optional) Student's email
-        - scenario_results: List of ScenarioResult objects
+    Build the downloadable session report with totals and a verification code.
     """
+    with span("session_report"):
+        return _build_session_report(submission)
+
+
+def _build_session_report(submission: SessionSubmission) -> dict:
     import hashlib
-    import json
     from datetime import datetime
 
     # Calculate total score
@@ -203,6 +517,7 @@ def submit_session(submission: SessionSubmission):
         "scenario_results": [
             {
                 "scenario_id": r.scenario_id,
+                "scenario_version": r.scenario_version,
                 "score": r.score,
                 "max_score": r.max_score,
                 "topic": r.topic_label,
@@ -229,13 +544,72 @@ def submit_session(submission: SessionSubmission):
     }
 
 
+@app.post("/api/submit-session")
+def submit_session(submission: SessionSubmission):
+    """
+    Submit complete session results and generate downloadable report.
+
+    Request body:
+        - student_name: Student's name
+        - student_email: (optional) Student's email
+        - scenario_results: List of ScenarioResult objects
+    """
+    response = create_session_report(submission)
+    store_session(submission, response)
+    email_session(submission, response)
+    return response
+
+
+@app.post("/api/grade-batch")
+def grade_batch(batch: BatchSubmission):
+    """
+    Grade all of a student's scenarios and build the session report in one request.
+
+    Request body:
+        - student_name: Student's name
+        - student_email: (optional) Student's email
+        - submissions: List of Submission objects (same shape as /api/grade)
+
+    Returns the submit-session response plus the graded scenario_results.
+    """
+    registry = get_registry()
+    executor = get_grading_executor()
+
+    try:
+        scenario_results = [executor.grade_blocking(registry, s) for s in batch.submissions]
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except GradingBusyError as e:
+        raise busy_response(e)
+    except Exception as e:
+        print(f"Error grading batch: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Grading error: {str(e)}")
+
+    session = SessionSubmission(
+        student_name=batch.student_name,
+        student_email=batch.student_email,
+        scenario_results=scenario_results
+    )
+
+    response = create_session_report(session)
+    store_session(session, response)
+    email_session(session, response)
+    response["scenario_results"] = scenario_results
+    return response
+
+
 @app.post("/api/generate-report")
 def generate_text_report(submission: SessionSubmission):
     """
     Generate plain text report (backup if email fails).
     Returns text that student can copy and email manually.
     """
-    report = format_plain_text_report(submission)
+    with span("text_report"):
+        report = render_text_report(submission)
 
     return {
         "report": report,
@@ -243,30 +617,238 @@ def generate_text_report(submission: SessionSubmission):
     }
 
 
+def report_download(submission: SessionSubmission, report_format: str, name: str) -> StreamingResponse:
+    """Stream a rendered report as a file download."""
+    render_chunks, media_type, extension = REPORT_FORMATS[report_format]
+    return StreamingResponse(
+        encode_chunks(render_chunks(submission)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'}
+    )
+
+
+@app.post("/api/report/download")
+def download_report(submission: SessionSubmission, format: Literal["html", "text"] = "html"):
+    """
+    Download the session report as an HTML or plain text file.
+    The report is streamed one scenario at a time.
+    """
+    return report_download(submission, format, "primary-source-results")
+
+
 @app.get("/api/stats")
-def get_stats():
+async def get_stats(request: Request):
     """
     Get statistics about available scenarios.
     Useful for showing progress (e.g., "3/10 scenarios completed").
     """
-    difficulties = {}
-    total_topics = 0
+    return await payload_response(request, await registry_payload("stats_payload"))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Request and span latency histograms in Prometheus text format.
+    Counts are per process and reset on restart.
+    """
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 
-    for scenario in SCENARIOS:
-        diff = scenario.difficulty
-        difficulties[diff] = difficulties.get(diff, 0) + 1
-        total_topics += len(scenario.topics)
+@app.post("/api/admin/reload", dependencies=[Depends(require_admin)])
+def admin_reload():
+    """
+    Reload scenario files without restarting the process.
+    Requires the X-Admin-Token header.
+    """
+    try:
+        registry = reload_scenarios()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
 
     return {
-        "total_scenarios": len(SCENARIOS),
-        "difficulties": difficulties,
-        "total_topics": total_topics,
-        "avg_topics_per_scenario": round(total_topics / len(SCENARIOS), 1)
+        "success": True,
+        "scenarios": len(registry),
+        "etag": registry.payload.etag
     }
 
 
+def require_result_store() -> "ResultStore":
+    """The results store, or 503 if it is unavailable."""
+    store = get_result_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Results store unavailable")
+    return store
+
+
+@app.get("/api/admin/sessions", dependencies=[Depends(require_admin)])
+def list_sessions(
+    student: Optional[str] = None,
+    scenario_id: Optional[str] = None,
+    topic_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    offset: int = 0
+):
+    """
+    Stored sessions, newest first.
+
+    Query parameters (all optional):
+        - student: Student name or email
+        - scenario_id / topic_id: Sessions that include this scenario/topic
+        - since / until: Submission time range (ISO 8601)
+        - limit / offset: Paging (limit capped at 1000)
+    """
+    store = require_result_store()
+    store.flush()
+    return store.list_sessions(
+        student=student, scenario_id=scenario_id, topic_id=topic_id,
+        since=since, until=until, limit=max(1, min(limit, 1000)), offset=max(0, offset)
+    )
+
+
+@app.get("/api/admin/sessions/{verification_code}", dependencies=[Depends(require_admin)])
+def get_stored_session(verification_code: str):
+    """A stored session with every scenario result and node grade."""
+    store = require_result_store()
+    store.flush()
+    session = store.get_session(verification_code)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+@app.get("/api/admin/sessions/{verification_code}/report", dependencies=[Depends(require_admin)])
+def download_stored_report(verification_code: str, format: Literal["html", "text"] = "html"):
+    """A stored session's report as an HTML or plain text download."""
+    store = require_result_store()
+    store.flush()
+    session = store.get_session(verification_code)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    from results_store import submission_from_stored
+    return report_download(
+        submission_from_stored(session), format,
+        f"primary-source-results-{session['verification_code']}"
+    )
+
+
+@app.get("/api/admin/export", dependencies=[Depends(require_admin)])
+def export_reports(format: Literal["zip", "tar.gz"] = "zip"):
+    """
+    Every stored session report (JSON, text and HTML) plus summary.csv,
+    streamed as one ZIP or tar.gz archive built on the fly.
+    """
+    from export import EXPORT_FORMATS, stream_export
+
+    store = require_result_store()
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"primary-source-results-{datetime.now():%Y%m%d}.{extension}"
+    return StreamingResponse(
+        stream_export(store, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/api/admin/analytics", dependencies=[Depends(require_admin)])
+def analytics_overview(top: int = 5):
+    """
+    Per-scenario result counts, average scores, node error rates and score
+    distributions, with each scenario's most-missed nodes.
+    """
+    analytics = get_analytics()
+    if analytics is None:
+        raise HTTPException(status_code=503, detail="Results store unavailable")
+    return analytics.overview(top=max(0, min(top, 50)))
+
+
+@app.get("/api/admin/analytics/{scenario_id}", dependencies=[Depends(require_admin)])
+def analytics_for_scenario(scenario_id: str, top: int = 3):
+    """
+    Per-topic and per-node breakdown for one scenario, nodes ordered by
+    error rate with their most common wrong classifications.
+    """
+    analytics = get_analytics()
+    if analytics is None:
+        raise HTTPException(status_code=503, detail="Results store unavailable")
+    detail = analytics.scenario_detail(scenario_id, top=max(0, min(top, 10)))
+    if detail is None:
+        raise HTTPException(status_code=404, detail="No results for this scenario")
+    return detail
+
+
+@app.get("/api/admin/mail", dependencies=[Depends(require_admin)])
+def mail_status():
+    """Delivery queue counters (queued, in flight, sent, retried, dead-lettered)."""
+    queue = get_mail_queue()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="No mail transport configured")
+    stats = queue.stats()
+    if DIGEST is not None:
+        stats["digest_pending"] = DIGEST.pending()
+    return stats
+
+
+@app.post("/api/admin/mail/requeue", dependencies=[Depends(require_admin)])
+def requeue_mail():
+    """Put every dead-lettered email back on the delivery queue."""
+    queue = get_mail_queue()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="No mail transport configured")
+    return {"requeued": queue.requeue_dead_letters()}
+
+
+@app.get("/api/admin/grading", dependencies=[Depends(require_admin)])
+def grading_status():
+    """Grading executor mode and counters (pending, inline, offloaded, rejected, pool restarts)."""
+    return get_grading_executor().stats()
+
+
+@app.get("/api/admin/profiler", dependencies=[Depends(require_admin)])
+def profiler_status():
+    """Current profiler settings and how much has been collected."""
+    return PROFILER.status()
+
+
+@app.post("/api/admin/profiler", dependencies=[Depends(require_admin)])
+def configure_profiler(settings: ProfilerSettings):
+    """
+    Turn request sampling on or off.
+
+    Request body:
+        - rate: Fraction of requests to profile (0 disables)
+        - interval_ms: Stack sampling interval while profiling
+        - reset: Discard the samples collected so far
+    """
+    interval = settings.interval_ms / 1000 if settings.interval_ms else None
+    PROFILER.configure(settings.rate, interval, settings.reset)
+    return PROFILER.status()
+
+
+@app.get("/api/admin/profiler/collapsed", dependencies=[Depends(require_admin)])
+def download_profile_collapsed():
+    """Collected samples as collapsed stacks, ready for flamegraph.pl or speedscope."""
+    return PlainTextResponse(
+        PROFILER.collapsed(),
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'}
+    )
+
+
+@app.get("/api/admin/profiler/pstats", dependencies=[Depends(require_admin)])
+def download_profile_pstats():
+    """Collected samples as a pstats file, readable with pstats.Stats or snakeviz."""
+    return Response(
+        content=PROFILER.pstats_bytes(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="profile.pstats"'}
+    )
+
+
 # Development server startup
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # Auto-reload is for development; production runs serve.py
+    reload = os.getenv("RELOAD", "").lower() in ("1", "true", "yes")
+    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=reload)
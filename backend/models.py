@@ -53,6 +53,8 @@ class Scenario(BaseModel):
     edges: List[Edge]
     topics: List[Topic]
     difficulty: Literal["easy", "medium", "hard"] = "medium"
+    course: Optional[str] = None  # Selects a per-course justification rule set
+    version: Optional[str] = None  # Content hash, stamped when the scenario is compiled
 
 
 class Classification(BaseModel):
@@ -70,6 +72,7 @@ class Submission(BaseModel):
     student_name: Optional[str] = "Anonymous"
     classifications: List[Classification]
     topic_id: str
+    scenario_version: Optional[str] = None  # Version the student saw, if known
 
 
 class GradingResult(BaseModel):
@@ -87,6 +90,8 @@ class ScenarioResult(BaseModel):
     max_score: int
     results: List[GradingResult]
     topic_label: str
+    scenario_version: Optional[str] = None
+    topic_id: Optional[str] = None
 
 
 class SessionSubmission(BaseModel):
@@ -96,6 +101,20 @@ class SessionSubmission(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
+class BatchSubmission(BaseModel):
+    """All of a student's scenario submissions, graded in one request."""
+    student_name: str
+    student_email: Optional[str] = None
+    submissions: List[Submission]
+
+
 class EmailResponse(BaseModel):
     success: bool
     message: str
+
+
+class ProfilerSettings(BaseModel):
+    """Admin request to turn request sampling on (rate > 0) or off (rate = 0)."""
+    rate: float = Field(ge=0.0, le=1.0)
+    interval_ms: Optional[float] = Field(default=None, gt=0.0, le=1000.0)
+    reset: bool = False
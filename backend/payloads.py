@@ -0,0 +1,131 @@
+"""
+Pre-rendered JSON payloads for the static scenario endpoints.
+Responses are serialized and compressed once when a scenario set is loaded
+and then served as raw bytes, skipping per-request Pydantic serialization.
+"""
+
+import gzip
+import hashlib
+import json
+from functools import cached_property
+from typing import Any, Iterable, Optional, Tuple
+
+# Optional fast paths: orjson for serialization, brotli for compression
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+# Compression levels: near-maximal ratios at a few ms per payload. Brotli's
+# default quality 11 saves ~13% more but costs ~20x the time (47 ms for the
+# full scenario list), paid again on every reload.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize JSON-compatible data to compact UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_etag(data: bytes) -> str:
+    """Strong HTTP ETag (quoted) for a serialized payload."""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def _accepted_codings(accept_encoding: str) -> set:
+    """Content codings the client accepts with a non-zero quality."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class Payload:
+    """
+    JSON body plus its ETag and compressed variants.
+
+    The body and ETag are computed up front; the gzip and brotli variants
+    are compressed on first use and then kept, so a cold process does not
+    pay for encodings no client has asked for yet. Call precompress() to
+    build them eagerly; needs_encoding() tells async callers when encoded()
+    would compress, so they can run it off the event loop.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = content_etag(body)
+
+    @classmethod
+    def from_data(cls, data: Any) -> "Payload":
+        return cls(dumps(data))
+
+    @classmethod
+    def from_list(cls, payloads: Iterable["Payload"]) -> "Payload":
+        """JSON array payload assembled from already-serialized items."""
+        return cls(b"[" + b",".join(p.body for p in payloads) + b"]")
+
+    @cached_property
+    def gzip(self) -> bytes:
+        return gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    @cached_property
+    def br(self) -> Optional[bytes]:
+        return brotli.compress(self.body, quality=BROTLI_QUALITY) if brotli is not None else None
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        """
+        ETag of one encoded variant. Each content coding is a different
+        representation, so gzip and brotli bodies get their own strong ETag.
+        """
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + "-" + encoding + '"'
+
+    def precompress(self) -> None:
+        """Build every compressed variant now."""
+        self.gzip
+        self.br
+
+    @staticmethod
+    def coding(accept_encoding: str) -> Optional[str]:
+        """Best content coding for an Accept-Encoding header, or None for identity."""
+        accepted = _accepted_codings(accept_encoding) if accept_encoding else set()
+        if "br" in accepted and brotli is not None:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def needs_encoding(self, accept_encoding: str) -> bool:
+        """True if encoded() would have to compress a variant first."""
+        coding = self.coding(accept_encoding)
+        return coding is not None and coding not in self.__dict__
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """
+        Pick the best variant for an Accept-Encoding header.
+
+        Returns:
+            (body, content_encoding or None for identity)
+        """
+        coding = self.coding(accept_encoding)
+        if coding is None:
+            return self.body, None
+        return getattr(self, coding), coding
@@ -0,0 +1,222 @@
+"""
+Opt-in statistical profiler for live traffic.
+
+A fraction of requests is chosen for sampling. While at least one chosen
+request is in flight, a background thread snapshots every thread's Python
+stack at a fixed interval and counts identical stacks. The aggregate can be
+downloaded as collapsed stacks (for flamegraph.pl / speedscope) or as a
+pstats file (for pstats / snakeviz).
+
+When the rate is 0 no thread runs and the middleware costs one comparison
+per request. Profiles are per process.
+"""
+
+import marshal
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# (filename, first line, function name): the key pstats uses for a function
+FuncKey = Tuple[str, int, str]
+
+MAX_STACK_DEPTH = 128
+
+# Leaf frames of threads parked waiting for work rather than running it
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+def _is_idle(key: FuncKey) -> bool:
+    filename, _, name = key
+    return (filename.rsplit("/", 1)[-1], name) in IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Aggregates stack samples taken while sampled requests are running."""
+
+    def __init__(self):
+        self.rate = 0.0
+        self.interval = 0.005
+        self.samples = 0
+        self.sampled_requests = 0
+        self.started_at = None
+        self._stacks: Counter = Counter()
+        self._seconds: Counter = Counter()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._busy = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def configure(self, rate: float, interval: Optional[float] = None, reset: bool = False) -> None:
+        """Set the sampled fraction of requests; 0 disables and stops the sampler thread."""
+        with self._lock:
+            if reset:
+                self._stacks.clear()
+                self._seconds.clear()
+                self.samples = 0
+                self.sampled_requests = 0
+                self.started_at = None
+            if interval:
+                self.interval = interval
+            self.rate = rate
+
+            if rate > 0:
+                if self.started_at is None:
+                    self.started_at = time.time()
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="sampling-profiler", daemon=True
+                    )
+                    self._thread.start()
+
+    def should_sample(self) -> bool:
+        rate = self.rate
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active += 1
+            self.sampled_requests += 1
+            self._busy.set()
+
+    def end(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._busy.clear()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        last = None
+        while self.rate > 0:
+            # Wake periodically so a disabled profiler's thread exits
+            if not self._busy.is_set():
+                last = None
+                self._busy.wait(0.5)
+                continue
+            now = time.perf_counter()
+            # Each sample stands for the wall time since the previous one
+            self._sample(own_ident, now - last if last is not None else self.interval)
+            last = now
+            time.sleep(self.interval)
+
+    def _sample(self, own_ident: int, elapsed: float) -> None:
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack and not _is_idle(stack[0]):
+                stack.reverse()
+                stacks.append(tuple(stack))
+
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                self._stacks[stack] += 1
+                self._seconds[stack] += elapsed
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate": self.rate,
+                "interval_ms": self.interval * 1000,
+                "samples": self.samples,
+                "sampled_requests": self.sampled_requests,
+                "distinct_stacks": len(self._stacks),
+                "started_at": self.started_at,
+            }
+
+    def collapsed(self) -> str:
+        """
+        Aggregated stacks in collapsed format, one "root;...;leaf count" line
+        per distinct stack, as read by flamegraph.pl and speedscope.
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+
+        lines = []
+        for stack, count in sorted(stacks, key=lambda item: -item[1]):
+            frames = ";".join(
+                f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+                for filename, line, name in stack
+            )
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats_bytes(self) -> bytes:
+        """
+        Aggregated samples as a marshalled pstats table (load with
+        pstats.Stats(path)). Call counts are sample counts and times are
+        the wall time the samples stand for.
+        """
+        with self._lock:
+            stacks = [(stack, count, self._seconds[stack]) for stack, count in self._stacks.items()]
+
+        # func -> [sample count, self seconds, inclusive seconds]
+        totals: Dict[FuncKey, list] = {}
+        # callee -> caller -> [sample count, self seconds, inclusive seconds]
+        callers: Dict[FuncKey, Dict[FuncKey, list]] = {}
+
+        for stack, count, seconds in stacks:
+            leaf = stack[-1]
+            for func in set(stack):
+                entry = totals.setdefault(func, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[2] += seconds
+            totals[leaf][1] += seconds
+
+            for caller, callee in set(zip(stack, stack[1:])):
+                edge = callers.setdefault(callee, {}).setdefault(caller, [0, 0.0, 0.0])
+                edge[0] += count
+                edge[2] += seconds
+                if callee == leaf:
+                    edge[1] += seconds
+
+        stats = {}
+        for func, (calls, own, inclusive) in totals.items():
+            func_callers = {
+                caller: (n, n, own_s, incl_s)
+                for caller, (n, own_s, incl_s) in callers.get(func, {}).items()
+            }
+            stats[func] = (calls, calls, own, inclusive, func_callers)
+        return marshal.dumps(stats)
+
+
+PROFILER = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware marking a sampled fraction of requests for PROFILER."""
+
+    def __init__(self, app, profiler: SamplingProfiler = PROFILER):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        profiler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.end()
@@ -0,0 +1,309 @@
+"""
+Scenario registry with precompiled lookup indexes.
+Holds every loaded scenario together with its compiled graph, answer keys
+and dict-backed topic/node indexes, so endpoints never scan lists.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+from models import Scenario, ScenarioResult, SourceNode, Submission, Topic
+from payloads import Payload
+from metrics import span
+from scenario_store import ScenarioStore, directory_fingerprint
+from grading import (
+    AnswerKey, ScenarioGraph, build_answer_keys, build_graph, grade_submission
+)
+
+
+class NotFoundError(LookupError):
+    """Raised when a submission references an unknown scenario or topic."""
+
+
+class VersionConflictError(Exception):
+    """Raised when a submission was made against an older scenario version."""
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """A scenario plus everything derived from it for grading and feedback."""
+    scenario: Scenario
+    graph: ScenarioGraph
+    answer_keys: Mapping[str, AnswerKey]
+    topics: Mapping[str, Topic]
+    nodes: Mapping[str, SourceNode]
+    payload: Payload  # pre-rendered JSON for /api/scenario/{id}
+    version: str
+
+    def topic(self, topic_id: str) -> Optional[Topic]:
+        return self.topics.get(topic_id)
+
+    def node(self, node_id: str) -> Optional[SourceNode]:
+        return self.nodes.get(node_id)
+
+
+def scenario_version(scenario: Scenario) -> str:
+    """Content hash of a scenario, ignoring any version already stamped on it."""
+    content = scenario.model_dump_json(exclude={"version"})
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def compile_scenario(scenario: Scenario, version: Optional[str] = None) -> CompiledScenario:
+    """
+    Build the graph, answer keys and lookup indexes for one scenario.
+    The compiled copy of the scenario is stamped with its content version.
+    """
+    version = version or scenario_version(scenario)
+    scenario = scenario.model_copy(update={"version": version})
+    with span("build_graph", scenario.id):
+        graph = build_graph(scenario)
+
+    # classify_sources runs here, once per topic
+    with span("build_answer_keys", scenario.id):
+        answer_keys = build_answer_keys(scenario, graph)
+
+    # setdefault keeps the first entry on duplicate ids, like a linear scan would
+    topics: Dict[str, Topic] = {}
+    for topic in scenario.topics:
+        topics.setdefault(topic.id, topic)
+
+    nodes: Dict[str, SourceNode] = {}
+    for node in scenario.nodes:
+        nodes.setdefault(node.id, node)
+
+    return CompiledScenario(
+        scenario=scenario,
+        graph=graph,
+        answer_keys=answer_keys,
+        topics=topics,
+        nodes=nodes,
+        payload=Payload.from_data(scenario.model_dump(mode="json", by_alias=True)),
+        version=version,
+    )
+
+
+class ScenarioRegistry:
+    """
+    Indexed, compiled view of a scenario set.
+
+    Built either from a list of scenarios (compiled eagerly) or over a
+    ScenarioStore with from_store(), in which case each scenario is loaded
+    and compiled the first time it is requested. The set of ids is fixed
+    at construction; loading a new scenario set means building a new
+    registry, which also drops every cache derived from the old one.
+
+    Compiled entries are keyed on (scenario id, content version): pass the
+    registry being replaced as previous and unchanged scenarios reuse its
+    compiled graphs, answer keys and payloads instead of recompiling.
+    """
+
+    def __init__(
+        self,
+        scenarios: Iterable[Scenario] = (),
+        store: Optional[ScenarioStore] = None,
+        previous: Optional["ScenarioRegistry"] = None
+    ):
+        self._entries: Dict[str, CompiledScenario] = {}
+        self._lock = threading.Lock()
+        self._store = store
+        self._previous = previous
+
+        if store is not None:
+            self._ids: List[str] = store.ids()
+        else:
+            self._ids = []
+            for scenario in scenarios:
+                if scenario.id in self._entries:
+                    continue
+                self._ids.append(scenario.id)
+                self._entries[scenario.id] = self._compile(scenario)
+            self._previous = None
+
+        self._id_set = frozenset(self._ids)
+
+        # Scenario directory and its fingerprint when built (see build_registry)
+        self.source_directory = store.directory if store is not None else None
+        self.fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_store(
+        cls,
+        store: ScenarioStore,
+        previous: Optional["ScenarioRegistry"] = None
+    ) -> "ScenarioRegistry":
+        """Registry that loads and compiles scenarios from store on demand."""
+        return cls(store=store, previous=previous)
+
+    def _compile(self, scenario: Scenario) -> CompiledScenario:
+        """Compile a scenario, reusing the previous registry's entry if unchanged."""
+        version = scenario_version(scenario)
+        previous = self._previous
+        if previous is not None:
+            entry = previous._entries.get(scenario.id)
+            if entry is not None and entry.version == version:
+                return entry
+        return compile_scenario(scenario, version)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Scenario]:
+        return iter(self.scenarios)
+
+    def ids(self) -> List[str]:
+        """All scenario ids in load order, without loading any scenario."""
+        return list(self._ids)
+
+    @cached_property
+    def scenarios(self) -> List[Scenario]:
+        """All scenarios in load order (loads every scenario)."""
+        return [self.get(sid).scenario for sid in self._ids]
+
+    # Pre-rendered responses for /api/scenarios and /api/stats
+    @cached_property
+    def payload(self) -> Payload:
+        return Payload.from_list(self.get(sid).payload for sid in self._ids)
+
+    @cached_property
+    def stats(self) -> dict:
+        return self._compute_stats()
+
+    @cached_property
+    def stats_payload(self) -> Payload:
+        return Payload.from_data(self.stats)
+
+    def compile_all(self) -> None:
+        """Load and compile every scenario now, surfacing invalid files early."""
+        for sid in self._ids:
+            self.get(sid)
+        # Every entry is now compiled; let the replaced registry be freed
+        self._previous = None
+
+    def warm_up(self) -> "ScenarioRegistry":
+        """
+        Compile every scenario and render and compress the shared payloads,
+        after which reads (get, payload, stats_payload and their encoded
+        variants) never do more than a lookup.
+        """
+        self.compile_all()
+        self.precompress()
+        return self
+
+    def is_stale(self) -> bool:
+        """True if the scenario files changed after this registry was built."""
+        if self.source_directory is None or self.fingerprint is None:
+            return False
+        return directory_fingerprint(self.source_directory) != self.fingerprint
+
+    def rendered(self, name: str) -> Optional[Payload]:
+        """The payload or stats_payload if already rendered, else None."""
+        return self.__dict__.get(name)
+
+    def precompress(self) -> None:
+        """Build the compressed variants of every pre-rendered payload now."""
+        self.payload.precompress()
+        self.stats_payload.precompress()
+        for sid in self._ids:
+            self.get(sid).payload.precompress()
+
+    def _compute_stats(self) -> dict:
+        """Scenario counts by difficulty and topic totals for /api/stats."""
+        difficulties = {}
+        total_topics = 0
+
+        for scenario in self.scenarios:
+            diff = scenario.difficulty
+            difficulties[diff] = difficulties.get(diff, 0) + 1
+            total_topics += len(scenario.topics)
+
+        return {
+            "total_scenarios": len(self._ids),
+            "difficulties": difficulties,
+            "total_topics": total_topics,
+            "avg_topics_per_scenario": (
+                round(total_topics / len(self._ids), 1) if self._ids else 0
+            )
+        }
+
+    def get(self, scenario_id: str) -> Optional[CompiledScenario]:
+        """Compiled scenario by id, or None if unknown."""
+        entry = self._entries.get(scenario_id)
+        if entry is not None or scenario_id not in self._id_set:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(scenario_id)
+            if entry is None:
+                entry = self._compile(self._store.get(scenario_id))
+                self._entries[scenario_id] = entry
+        return entry
+
+    def loaded(self, scenario_id: str) -> Optional[CompiledScenario]:
+        """Compiled scenario if it is already loaded; never loads or compiles."""
+        return self._entries.get(scenario_id)
+
+    def scenario(self, scenario_id: str) -> Optional[Scenario]:
+        entry = self.get(scenario_id)
+        return entry.scenario if entry else None
+
+    def topic(self, scenario_id: str, topic_id: str) -> Optional[Topic]:
+        entry = self.get(scenario_id)
+        return entry.topic(topic_id) if entry else None
+
+    def node(self, scenario_id: str, node_id: str) -> Optional[SourceNode]:
+        entry = self.get(scenario_id)
+        return entry.node(node_id) if entry else None
+
+    def grade(self, submission: Submission) -> ScenarioResult:
+        """
+        Grade one submission against its compiled scenario.
+
+        Raises:
+            NotFoundError: if the scenario or topic does not exist
+            VersionConflictError: if the submission names a scenario_version
+                that is no longer current
+        """
+        compiled = self.get(submission.scenario_id)
+        if not compiled:
+            raise NotFoundError("Scenario not found")
+
+        if submission.scenario_version and submission.scenario_version != compiled.version:
+            raise VersionConflictError("Scenario has changed; reload it and submit again")
+
+        topic = compiled.topic(submission.topic_id)
+        if not topic:
+            raise NotFoundError("Topic not found")
+
+        with span("grade_submission", compiled.scenario.id):
+            score, max_score, results = grade_submission(
+                scenario=compiled.scenario,
+                topic=topic,
+                classifications=submission.classifications,
+                graph=compiled.graph,
+                answer_key=compiled.answer_keys[topic.id]
+            )
+
+        return ScenarioResult(
+            scenario_id=submission.scenario_id,
+            score=score,
+            max_score=max_score,
+            results=results,
+            topic_label=topic.label,
+            scenario_version=compiled.version,
+            topic_id=topic.id
+        )
+
+
+def build_registry(previous: Optional[ScenarioRegistry] = None) -> ScenarioRegistry:
+    """
+    Build a registry over the scenario store (SCENARIO_DIR); each scenario
+    is loaded from its file on first use. Unchanged scenarios reuse their
+    compiled entries from previous.
+    """
+    store = ScenarioStore()
+    fingerprint = store.fingerprint()
+    registry = ScenarioRegistry.from_store(store, previous=previous)
+    registry.fingerprint = fingerprint
+    return registry
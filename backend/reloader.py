@@ -0,0 +1,71 @@
+"""
+Hot reload support for the scenario set.
+
+A ScenarioWatcher thread polls the scenario directory's fingerprint and
+calls back when files change; SIGHUP triggers the same callback. The
+callback is expected to build a complete new registry before swapping it
+in, so requests already running keep using the registry they started with.
+"""
+
+import signal
+import threading
+from pathlib import Path
+from typing import Callable
+
+from scenario_store import directory_fingerprint
+
+
+class ScenarioWatcher(threading.Thread):
+    """Daemon thread that calls on_change when the scenario directory changes."""
+
+    def __init__(self, directory: Path, on_change: Callable[[], None], interval: float = 2.0):
+        super().__init__(name="scenario-watcher", daemon=True)
+        self.directory = directory
+        self.on_change = on_change
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        last = directory_fingerprint(self.directory)
+        while not self._stopped.wait(self.interval):
+            current = directory_fingerprint(self.directory)
+            if current == last:
+                continue
+            last = current
+            try:
+                self.on_change()
+            except Exception as e:
+                # Keep watching; the previous scenario set stays in service
+                print(f"Scenario reload failed: {e}")
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+def install_sighup_handler(reload: Callable[[], None]) -> bool:
+    """
+    Run reload in a background thread whenever the process gets SIGHUP.
+    The work is handed off so the signal never interrupts code holding
+    the registry lock.
+
+    Returns:
+        True if installed (False off the main thread or without SIGHUP)
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return False
+
+    def _run_reload() -> None:
+        try:
+            reload()
+        except Exception as e:
+            print(f"Scenario reload failed: {e}")
+
+    def _handler(signum, frame) -> None:
+        threading.Thread(target=_run_reload, name="scenario-reload", daemon=True).start()
+
+    try:
+        signal.signal(signal.SIGHUP, _handler)
+    except ValueError:
+        # signal.signal only works in the main thread
+        return False
+    return True
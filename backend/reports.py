@@ -0,0 +1,282 @@
+"""
+Session report rendering.
+
+Reports are produced by generators that yield chunks (one per scenario),
+so a single report never needs to be built by repeated concatenation and
+a whole course of reports can be streamed in bounded memory. Templates
+are compiled once at import; every student- or scenario-supplied value is
+HTML-escaped in the HTML report.
+"""
+
+import html
+from typing import Iterable, Iterator, List
+
+from models import ScenarioResult, SessionSubmission
+
+REPORT_STYLE = """
+        <style>
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #F6F4F0; padding: 20px; }
+            .container { max-width: 800px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 8px; }
+            h1 { color: #2B2B2B; border-bottom: 3px solid #B2643C; padding-bottom: 10px; }
+            h2 { color: #52796F; margin-top: 25px; }
+            .summary { background-color: #F6F4F0; padding: 15px; border-left: 4px solid #84A98C; margin: 20px 0; }
+            .score { font-size: 24px; font-weight: bold; color: #52796F; }
+            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            th { background-color: #52796F; color: white; padding: 12px; text-align: left; }
+            td { padding: 10px; border-bottom: 1px solid #C0C7C4; }
+            tr:nth-child(even) { background-color: #F6F4F0; }
+            .correct { color: #84A98C; font-weight: bold; }
+            .incorrect { color: #B2643C; font-weight: bold; }
+            .footer { margin-top: 30px; padding-top: 20px; border-top: 1px solid #C0C7C4; color: #8D99AE; font-size: 12px; }
+        </style>
+"""
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _html_head(title: str) -> str:
+    return """
+    <html>
+    <head>""" + REPORT_STYLE + """    </head>
+    <body>
+        <div class="container">
+            <h1>Primary Source Trainer - """ + title + """</h1>
+"""
+
+
+# Page heads (with the stylesheet) are rendered once; the remaining
+# templates are bound str.format methods over constant strings
+_SESSION_HEAD = _html_head("Session Results")
+_DIGEST_HEAD = _html_head("Results Digest")
+
+_HTML_FOOT = """
+            <div class="footer">
+                <p>Generated by Primary Source Trainer</p>
+                <p>This is an automated email with student results from the early medieval source classification exercise.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+_HTML_SUMMARY = """
+            <div class="summary">
+                <p><strong>Student:</strong> {student_name}</p>
+                {email_line}
+                <p><strong>Completed:</strong> {completed}</p>
+                <p class="score">Overall Score: {total_score}/{total_max} ({percentage}%)</p>
+            </div>
+
+            <h2>Scenario Breakdown</h2>
+    """.format
+
+_HTML_EMAIL_LINE = "<p><strong>Email:</strong> {}</p>".format
+
+_HTML_SCENARIO = """
+            <h3>Scenario {index}: {scenario_id}</h3>
+            <p><strong>Topic:</strong> {topic_label}</p>
+            <p><strong>Score:</strong> {score}/{max_score} ({percentage}%)</p>
+
+            <table>
+                <tr>
+                    <th>Node</th>
+                    <th>Student Answer</th>
+                    <th>Correct Answer</th>
+                    <th>Points</th>
+                    <th>Result</th>
+                </tr>
+        """.format
+
+_HTML_GRADE_ROW = """
+                <tr>
+                    <td>{node_id}</td>
+                    <td>{student_answer}</td>
+                    <td>{correct_answer}</td>
+                    <td>{points}</td>
+                    <td class="{result_class}">{result_text}</td>
+                </tr>
+            """.format
+
+_HTML_DIGEST_HEAD = """
+            <div class="summary">
+                <p class="score">{count} session(s) submitted</p>
+            </div>
+
+            <table>
+                <tr>
+                    <th>Student</th>
+                    <th>Completed</th>
+                    <th>Score</th>
+                    <th>Percentage</th>
+                </tr>
+                """.format
+
+_HTML_DIGEST_ROW = """
+                <tr>
+                    <td>{student_name}</td>
+                    <td>{completed}</td>
+                    <td>{total_score}/{total_max}</td>
+                    <td>{percentage}%</td>
+                </tr>
+        """.format
+
+_RULE = "=" * 60
+_THIN_RULE = "-" * 60
+
+_TEXT_HEAD = f"""
+PRIMARY SOURCE TRAINER - SESSION RESULTS
+{_RULE}
+
+Student: {{student_name}}
+Completed: {{completed}}
+Overall Score: {{total_score}}/{{total_max}} ({{percentage}}%)
+
+{_RULE}
+SCENARIO BREAKDOWN
+{_RULE}
+
+""".format
+
+_TEXT_SCENARIO = ("\nScenario {index}: {scenario_id}\nTopic: {topic_label}\n"
+                  "Score: {score}/{max_score} ({percentage}%)\n" + _THIN_RULE + "\n").format
+
+_TEXT_GRADE = ("  {status} {node_id}\n"
+               "     Student: {student_answer} | Correct: {correct_answer}\n"
+               "     Points: {points} | {feedback}\n\n").format
+
+_TEXT_FOOT = f"\n{_RULE}\nEnd of Report\n"
+
+_escape = html.escape
+
+
+def _percentage(score: int, max_score: int) -> float:
+    return round((score / max_score * 100), 1) if max_score > 0 else 0
+
+
+def session_totals(submission: SessionSubmission) -> tuple:
+    """(total_score, total_max, percentage) for a session."""
+    total_score = sum(r.score for r in submission.scenario_results)
+    total_max = sum(r.max_score for r in submission.scenario_results)
+    return total_score, total_max, _percentage(total_score, total_max)
+
+
+def _html_scenario(index: int, result: ScenarioResult) -> str:
+    parts = [_HTML_SCENARIO(
+        index=index,
+        scenario_id=_escape(result.scenario_id),
+        topic_label=_escape(result.topic_label),
+        score=result.score,
+        max_score=result.max_score,
+        percentage=_percentage(result.score, result.max_score),
+    )]
+    for grade in result.results:
+        parts.append(_HTML_GRADE_ROW(
+            node_id=_escape(grade.node_id),
+            student_answer=_escape(grade.student_answer),
+            correct_answer=_escape(grade.correct_answer),
+            points=grade.points,
+            result_class="correct" if grade.is_correct else "incorrect",
+            result_text="✓ Correct" if grade.is_correct else "✗ Incorrect",
+        ))
+    parts.append("</table>")
+    return "".join(parts)
+
+
+def iter_html_section(submission: SessionSubmission) -> Iterator[str]:
+    """Summary and scenario breakdown of one session, without the page around it."""
+    total_score, total_max, percentage = session_totals(submission)
+    yield _HTML_SUMMARY(
+        student_name=_escape(submission.student_name),
+        email_line=_HTML_EMAIL_LINE(_escape(submission.student_email)) if submission.student_email else "",
+        completed=submission.timestamp.strftime(TIMESTAMP_FORMAT),
+        total_score=total_score,
+        total_max=total_max,
+        percentage=percentage,
+    )
+    for index, result in enumerate(submission.scenario_results, 1):
+        yield _html_scenario(index, result)
+
+
+def iter_html_report(submission: SessionSubmission) -> Iterator[str]:
+    """HTML report for one session, one chunk per scenario."""
+    yield _SESSION_HEAD
+    yield from iter_html_section(submission)
+    yield _HTML_FOOT
+
+
+def iter_html_digest(submissions: List[SessionSubmission]) -> Iterator[str]:
+    """One HTML document covering several sessions: an overview table, then each report."""
+    yield _DIGEST_HEAD
+    rows = []
+    for submission in submissions:
+        total_score, total_max, percentage = session_totals(submission)
+        rows.append(_HTML_DIGEST_ROW(
+            student_name=_escape(submission.student_name),
+            completed=submission.timestamp.strftime(TIMESTAMP_FORMAT),
+            total_score=total_score,
+            total_max=total_max,
+            percentage=percentage,
+        ))
+    yield _HTML_DIGEST_HEAD(count=len(submissions)) + "".join(rows) + "\n            </table>\n    "
+    for submission in submissions:
+        yield "<hr>"
+        yield from iter_html_section(submission)
+    yield _HTML_FOOT
+
+
+def iter_text_report(submission: SessionSubmission) -> Iterator[str]:
+    """Plain text report for one session, one chunk per scenario."""
+    total_score, total_max, percentage = session_totals(submission)
+    yield _TEXT_HEAD(
+        student_name=submission.student_name,
+        completed=submission.timestamp.strftime(TIMESTAMP_FORMAT),
+        total_score=total_score,
+        total_max=total_max,
+        percentage=percentage,
+    )
+    for index, result in enumerate(submission.scenario_results, 1):
+        parts = [_TEXT_SCENARIO(
+            index=index,
+            scenario_id=result.scenario_id,
+            topic_label=result.topic_label,
+            score=result.score,
+            max_score=result.max_score,
+            percentage=_percentage(result.score, result.max_score),
+        )]
+        for grade in result.results:
+            parts.append(_TEXT_GRADE(
+                status="✓" if grade.is_correct else "✗",
+                node_id=grade.node_id,
+                student_answer=grade.student_answer,
+                correct_answer=grade.correct_answer,
+                points=grade.points,
+                feedback=grade.feedback,
+            ))
+        yield "".join(parts)
+    yield _TEXT_FOOT
+
+
+def render(chunks: Iterable[str]) -> str:
+    """Join a chunk generator into one string."""
+    return "".join(chunks)
+
+
+def render_html_report(submission: SessionSubmission) -> str:
+    return render(iter_html_report(submission))
+
+
+def render_text_report(submission: SessionSubmission) -> str:
+    return render(iter_text_report(submission))
+
+
+def encode_chunks(chunks: Iterable[str], encoding: str = "utf-8") -> Iterator[bytes]:
+    """Encode a chunk generator for a streaming response."""
+    for chunk in chunks:
+        yield chunk.encode(encoding)
+
+
+REPORT_FORMATS = {
+    # format: (chunk generator, media type, file extension)
+    "html": (iter_html_report, "text/html; charset=utf-8", "html"),
+    "text": (iter_text_report, "text/plain; charset=utf-8", "txt"),
+}
@@ -0,0 +1,543 @@
+"""
+Durable storage for graded sessions.
+
+ResultStore is the interface the API writes through; SQLiteResultStore is
+the default engine. A session is stored with one row per scenario result
+and one row per graded node, indexed by student, scenario, topic and
+submission time so instructors can query a whole class instead of
+collecting downloaded report files.
+
+A batch the writer cannot store (database locked past the busy timeout,
+disk errors) is retried with exponential backoff and then spilled to a
+directory as JSON; spilled sessions are queued again the next time a
+store is opened on the same database.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from models import ScenarioResult, SessionSubmission
+
+DEFAULT_DATABASE_URL = "sqlite:///./primary_sources.db"
+
+# Where an in-memory store spills sessions it could not write; file stores
+# use "<database path>-spill" unless RESULTS_SPILL_DIR is set
+DEFAULT_SPILL_DIR = Path(__file__).parent / "results_spill"
+
+
+@dataclass(frozen=True)
+class SessionRecord:
+    """One submitted session as it is persisted."""
+    verification_code: str
+    student_name: str
+    student_email: Optional[str]
+    submitted_at: str  # ISO 8601, sorts chronologically
+    total_score: int
+    max_score: int
+    percentage: float
+    scenario_results: List[ScenarioResult]
+
+    @classmethod
+    def from_report(cls, submission: SessionSubmission, report_data: dict) -> "SessionRecord":
+        """Record for a submission and the report_data built for it."""
+        return cls(
+            verification_code=report_data["verification_code"],
+            student_name=submission.student_name,
+            student_email=submission.student_email,
+            submitted_at=report_data["submission_timestamp"],
+            total_score=report_data["total_score"],
+            max_score=report_data["max_score"],
+            percentage=report_data["percentage"],
+            scenario_results=list(submission.scenario_results),
+        )
+
+    def as_dict(self) -> dict:
+        """JSON-compatible form, as written to the spill directory."""
+        data = asdict(self)
+        data["scenario_results"] = [r.model_dump(mode="json") for r in self.scenario_results]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionRecord":
+        """Record from as_dict() output."""
+        data = dict(data)
+        data["scenario_results"] = [ScenarioResult(**r) for r in data["scenario_results"]]
+        return cls(**data)
+
+
+def submission_from_stored(session: dict) -> SessionSubmission:
+    """Rebuild the SessionSubmission for a session returned by get_session()."""
+    return SessionSubmission(
+        student_name=session["student_name"],
+        student_email=session["student_email"],
+        timestamp=session["submitted_at"],
+        scenario_results=session["scenario_results"],
+    )
+
+
+class StoredResult(NamedTuple):
+    """A stored scenario result with its node grades, as read back for analytics."""
+    result_id: int  # increases with every result stored, by any process
+    session_id: int
+    scenario_id: str
+    topic_id: Optional[str]
+    topic_label: str
+    score: int
+    max_score: int
+    grades: List[Tuple[str, str, str, bool]]  # (node_id, student_answer, correct_answer, is_correct)
+
+
+class ResultStore(ABC):
+    """Interface for session/result storage engines."""
+
+    @abstractmethod
+    def record_session(self, record: SessionRecord) -> None:
+        """Queue a session for storage; it may be written asynchronously."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Block until every queued session has been written."""
+
+    @abstractmethod
+    def list_sessions(
+        self,
+        student: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        topic_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[dict]:
+        """Session summaries, newest first, matching every given filter."""
+
+    @abstractmethod
+    def get_session(self, verification_code: str) -> Optional[dict]:
+        """A session with its scenario results and node grades, or None."""
+
+    @abstractmethod
+    def iter_sessions(self) -> Iterator[dict]:
+        """
+        Every stored session in submission order, shaped like get_session(),
+        yielded one at a time so the whole history is never held in memory.
+        The iterator may be advanced from different threads in turn.
+        """
+
+    @abstractmethod
+    def results_since(self, result_id: int) -> Iterator[StoredResult]:
+        """
+        Every scenario result stored after result_id, in result_id order,
+        including results written by other processes sharing the store.
+        A session's results are committed together, so none is ever
+        returned without the rest of its session.
+        """
+
+    def close(self) -> None:
+        """Write anything pending and release resources."""
+        self.flush()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    verification_code TEXT NOT NULL UNIQUE,
+    student_name TEXT NOT NULL,
+    student_email TEXT,
+    submitted_at TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    max_score INTEGER NOT NULL,
+    percentage REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_student ON sessions(student_name);
+CREATE INDEX IF NOT EXISTS idx_sessions_email ON sessions(student_email);
+CREATE INDEX IF NOT EXISTS idx_sessions_submitted ON sessions(submitted_at);
+
+CREATE TABLE IF NOT EXISTS scenario_results (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    scenario_id TEXT NOT NULL,
+    scenario_version TEXT,
+    topic_id TEXT,
+    topic_label TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    max_score INTEGER NOT NULL,
+    submitted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_session ON scenario_results(session_id);
+CREATE INDEX IF NOT EXISTS idx_results_scenario_topic ON scenario_results(scenario_id, topic_id);
+CREATE INDEX IF NOT EXISTS idx_results_topic ON scenario_results(topic_id);
+CREATE INDEX IF NOT EXISTS idx_results_submitted ON scenario_results(submitted_at);
+
+CREATE TABLE IF NOT EXISTS node_grades (
+    id INTEGER PRIMARY KEY,
+    result_id INTEGER NOT NULL REFERENCES scenario_results(id) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    student_answer TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    is_correct INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    feedback TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_grades_result ON node_grades(result_id);
+"""
+
+SESSION_FIELDS = (
+    "verification_code", "student_name", "student_email", "submitted_at",
+    "total_score", "max_score", "percentage",
+)
+SESSION_COLUMNS = ", ".join(SESSION_FIELDS)
+
+# Queue markers: write the current batch now / write it and exit
+_FLUSH = object()
+_STOP = object()
+
+
+def sqlite_path(url: str) -> str:
+    """
+    Database path for a sqlite:/// URL.
+
+    Raises:
+        ValueError: for URLs of any other engine
+    """
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        raise ValueError(f"Unsupported DATABASE_URL: {url}")
+    return url[len(prefix):] or ":memory:"
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite engine in WAL mode.
+
+    record_session() only enqueues; a writer thread drains the queue and
+    writes up to batch_size sessions per transaction, so request handlers
+    never wait on disk. Reads share the connection under a lock.
+
+    A failed batch is retried write_attempts times, waiting retry_delay
+    seconds and doubling it each time, then spilled to spill_dir.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        page_size: int = 200,
+        write_attempts: int = 5,
+        retry_delay: float = 0.5,
+        spill_dir: Optional[Path] = None
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.page_size = page_size  # sessions per read in iter_sessions()
+        self.write_attempts = max(1, write_attempts)
+        self.retry_delay = retry_delay
+        if spill_dir is None:
+            spill_dir = DEFAULT_SPILL_DIR if path == ":memory:" else Path(f"{path}-spill")
+        self.spill_dir = Path(spill_dir)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._writer.start()
+
+        requeued = self.requeue_spilled()
+        if requeued:
+            print(f"Requeued {requeued} spilled session(s) from {self.spill_dir}")
+
+    def record_session(self, record: SessionRecord) -> None:
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Gather whatever else arrives within flush_interval, up to batch_size
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] not in (_FLUSH, _STOP):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            records = [r for r in batch if r is not _FLUSH and r is not _STOP]
+            stopping = _STOP in batch
+            try:
+                if records:
+                    self._store_batch(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _store_batch(self, records: List[SessionRecord]) -> None:
+        """Write a batch, retrying with backoff; spill it if every attempt fails."""
+        for attempt in range(self.write_attempts):
+            try:
+                self._write(records)
+            except Exception as e:
+                error = e
+                if attempt + 1 < self.write_attempts:
+                    delay = self.retry_delay * 2 ** attempt
+                    print(f"Failed to store {len(records)} session(s): {e}; retrying in {delay:g}s")
+                    time.sleep(delay)
+                continue
+            return
+        self._spill(records, error)
+
+    def _spill(self, records: List[SessionRecord], error: Exception) -> None:
+        """Write a batch that could not be stored to the spill directory."""
+        data = {
+            "error": str(error),
+            "failed_at": datetime.now().isoformat(),
+            "sessions": [record.as_dict() for record in records],
+        }
+        path = self.spill_dir / f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}.json"
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            # Written under another name first so requeue_spilled() never reads half a file
+            partial = path.with_suffix(".partial")
+            partial.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            partial.replace(path)
+            print(f"Failed to store {len(records)} session(s): {error}; spilled to {path}")
+        except OSError as e:
+            # Last resort: the sessions survive in the log
+            print(f"Could not spill {len(records)} session(s) to {path}: {e}")
+            print(f"Unstored sessions: {json.dumps(data)}")
+
+    def requeue_spilled(self) -> int:
+        """
+        Queue every spilled session for storage again. Sessions already
+        stored are skipped by the write, so requeueing twice is harmless.
+
+        Returns:
+            Number of sessions requeued
+        """
+        count = 0
+        for path in sorted(self.spill_dir.glob("*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                path.unlink()
+            except FileNotFoundError:
+                continue  # requeued by another process sharing the database
+            for session in data["sessions"]:
+                self.record_session(SessionRecord.from_dict(session))
+                count += 1
+        return count
+
+    def _write(self, records: Iterable[SessionRecord]) -> None:
+        """Insert records in one transaction, skipping sessions already stored."""
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for record in records:
+                cur.execute(
+                    f"INSERT OR IGNORE INTO sessions ({SESSION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (record.verification_code, record.student_name, record.student_email,
+                     record.submitted_at, record.total_score, record.max_score, record.percentage)
+                )
+                if not cur.rowcount:
+                    continue  # already stored
+                session_id = cur.lastrowid
+
+                for result in record.scenario_results:
+                    cur.execute(
+                        "INSERT INTO scenario_results (session_id, scenario_id, scenario_version, "
+                        "topic_id, topic_label, score, max_score, submitted_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (session_id, result.scenario_id, result.scenario_version, result.topic_id,
+                         result.topic_label, result.score, result.max_score, record.submitted_at)
+                    )
+                    result_id = cur.lastrowid
+                    cur.executemany(
+                        "INSERT INTO node_grades (result_id, node_id, student_answer, "
+                        "correct_answer, is_correct, points, feedback) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(result_id, g.node_id, g.student_answer, g.correct_answer,
+                          int(g.is_correct), g.points, g.feedback) for g in result.results]
+                    )
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def list_sessions(
+        self,
+        student: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        topic_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[dict]:
+        clauses, params = [], []
+        if student:
+            clauses.append("(s.student_name = ? OR s.student_email = ?)")
+            params += [student, student]
+        if since:
+            clauses.append("s.submitted_at >= ?")
+            params.append(since.isoformat())
+        if until:
+            clauses.append("s.submitted_at < ?")
+            params.append(until.isoformat())
+        if scenario_id or topic_id:
+            sub = "SELECT 1 FROM scenario_results r WHERE r.session_id = s.id"
+            if scenario_id:
+                sub += " AND r.scenario_id = ?"
+                params.append(scenario_id)
+            if topic_id:
+                sub += " AND r.topic_id = ?"
+                params.append(topic_id)
+            clauses.append(f"EXISTS ({sub})")
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(
+            f"SELECT {', '.join('s.' + f for f in SESSION_FIELDS)} "
+            f"FROM sessions s {where} ORDER BY s.submitted_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return [dict(row) for row in rows]
+
+    # Sessions joined with their results and grades, in storage order
+    _SESSION_TREE_SQL = (
+        f"SELECT s.id, {', '.join('s.' + f for f in SESSION_FIELDS)}, "
+        "r.id, r.scenario_id, r.scenario_version, r.topic_id, r.topic_label, r.score, r.max_score, "
+        "g.node_id, g.student_answer, g.correct_answer, g.is_correct, g.points, g.feedback "
+        "FROM sessions s "
+        "LEFT JOIN scenario_results r ON r.session_id = s.id "
+        "LEFT JOIN node_grades g ON g.result_id = r.id "
+        "{where} ORDER BY s.id, r.id, g.id"
+    )
+
+    @staticmethod
+    def _assemble_sessions(rows: Iterable) -> Iterator[dict]:
+        """Group joined session/result/grade rows into nested session dicts."""
+        n = len(SESSION_FIELDS)
+        for _, session_rows in groupby(rows, key=lambda row: row[0]):
+            session_rows = list(session_rows)
+            session = dict(zip(SESSION_FIELDS, session_rows[0][1:n + 1]))
+            session["scenario_results"] = []
+
+            for result_id, result_rows in groupby(session_rows, key=lambda row: row[n + 1]):
+                if result_id is None:
+                    continue  # session without results
+                result_rows = list(result_rows)
+                first = result_rows[0]
+                session["scenario_results"].append({
+                    "scenario_id": first[n + 2],
+                    "scenario_version": first[n + 3],
+                    "topic_id": first[n + 4],
+                    "topic_label": first[n + 5],
+                    "score": first[n + 6],
+                    "max_score": first[n + 7],
+                    "results": [
+                        {
+                            "node_id": row[n + 8],
+                            "student_answer": row[n + 9],
+                            "correct_answer": row[n + 10],
+                            "is_correct": bool(row[n + 11]),
+                            "points": row[n + 12],
+                            "feedback": row[n + 13],
+                        }
+                        for row in result_rows if row[n + 8] is not None
+                    ],
+                })
+            yield session
+
+    def get_session(self, verification_code: str) -> Optional[dict]:
+        rows = self._query(
+            self._SESSION_TREE_SQL.format(where="WHERE s.verification_code = ?"),
+            (verification_code.upper(),)
+        )
+        return next(self._assemble_sessions(rows), None)
+
+    def _read(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        """
+        Run a read on its own short-lived connection, so it neither waits
+        for nor blocks the writer (the shared connection for :memory:).
+        """
+        if self.path == ":memory:":
+            return self._query(sql, params)
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, tuple(params)).fetchall()
+        finally:
+            conn.close()
+
+    def iter_sessions(self) -> Iterator[dict]:
+        # Read in pages of sessions by id, each on its own connection: no
+        # SQLite object outlives a page, so consumers such as
+        # StreamingResponse may advance the generator from any thread
+        sql = self._SESSION_TREE_SQL.format(
+            where="WHERE s.id IN (SELECT id FROM sessions WHERE id > ? ORDER BY id LIMIT ?)"
+        )
+        last_id = 0
+        while True:
+            rows = self._read(sql, (last_id, self.page_size))
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield from self._assemble_sessions(rows)
+
+    def results_since(self, result_id: int) -> Iterator[StoredResult]:
+        # Paged by result id like iter_sessions(), so every page holds whole
+        # results and no connection is held between pages
+        sql = (
+            "SELECT r.id, r.session_id, r.scenario_id, r.topic_id, r.topic_label, r.score, r.max_score, "
+            "g.node_id, g.student_answer, g.correct_answer, g.is_correct "
+            "FROM scenario_results r LEFT JOIN node_grades g ON g.result_id = r.id "
+            "WHERE r.id IN (SELECT id FROM scenario_results WHERE id > ? ORDER BY id LIMIT ?) "
+            "ORDER BY r.id, g.id"
+        )
+        while True:
+            rows = self._read(sql, (result_id, self.page_size))
+            if not rows:
+                return
+            result_id = rows[-1][0]
+            for _, group in groupby(rows, key=lambda row: row[0]):
+                group = list(group)
+                first = group[0]
+                grades = [(g[7], g[8], g[9], bool(g[10])) for g in group if g[7] is not None]
+                yield StoredResult(*first[:7], grades)
+
+def open_result_store(url: Optional[str] = None) -> ResultStore:
+    """
+    Open the store named by url (default: the DATABASE_URL setting).
+
+    Raises:
+        ValueError: if the URL names an engine that is not supported
+    """
+    url = url or os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL
+    return SQLiteResultStore(sqlite_path(url), spill_dir=os.getenv("RESULTS_SPILL_DIR") or None)
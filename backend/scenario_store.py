@@ -0,0 +1,122 @@
+"""
+File-backed scenario store.
+
+Each scenario lives in its own JSON file (<scenario_id>.json) in a data
+directory. An optional index.json fixes the display order; any other
+scenario files follow in name order. Files are parsed and validated only
+when a scenario is first requested, then cached for the life of the store.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import Scenario
+
+DEFAULT_SCENARIO_DIR = Path(__file__).parent / "scenario_data"
+INDEX_FILENAME = "index.json"
+
+
+class ScenarioStoreError(Exception):
+    """Raised when a scenario file cannot be read or fails validation."""
+
+
+class ScenarioStore:
+    """Lazily loading, validating cache over a directory of scenario files."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else scenario_directory()
+        self._ids = self._scan_ids()
+        self._cache: Dict[str, Scenario] = {}
+        self._lock = threading.Lock()
+
+    def _scan_ids(self) -> List[str]:
+        """Scenario ids in display order, without parsing any scenario file."""
+        on_disk = sorted(
+            p.stem for p in self.directory.glob("*.json") if p.name != INDEX_FILENAME
+        )
+
+        index_path = self.directory / INDEX_FILENAME
+        if not index_path.exists():
+            return on_disk
+
+        ordered = json.loads(index_path.read_text(encoding="utf-8")).get("scenarios", [])
+        available = set(on_disk)
+        ids = [sid for sid in dict.fromkeys(ordered) if sid in available]
+        listed = set(ids)
+        return ids + [sid for sid in on_disk if sid not in listed]
+
+    def ids(self) -> List[str]:
+        """All scenario ids in display order."""
+        return list(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, scenario_id: str) -> bool:
+        return scenario_id in self._cache or scenario_id in self._ids
+
+    def path_for(self, scenario_id: str) -> Path:
+        return self.directory / f"{scenario_id}.json"
+
+    def get(self, scenario_id: str) -> Optional[Scenario]:
+        """
+        Load, validate and cache one scenario.
+
+        Returns:
+            the scenario, or None if no file exists for scenario_id
+
+        Raises:
+            ScenarioStoreError: if the file is unreadable or invalid
+        """
+        scenario = self._cache.get(scenario_id)
+        if scenario is not None or scenario_id not in self._ids:
+            return scenario
+
+        with self._lock:
+            scenario = self._cache.get(scenario_id)
+            if scenario is None:
+                scenario = self._load(scenario_id)
+                self._cache[scenario_id] = scenario
+        return scenario
+
+    def _load(self, scenario_id: str) -> Scenario:
+        path = self.path_for(scenario_id)
+        try:
+            scenario = Scenario.model_validate_json(path.read_bytes())
+        except Exception as e:
+            raise ScenarioStoreError(f"Invalid scenario file {path.name}: {e}") from e
+
+        if scenario.id != scenario_id:
+            raise ScenarioStoreError(
+                f"Scenario file {path.name} declares id '{scenario.id}'"
+            )
+        return scenario
+
+    def load_all(self) -> List[Scenario]:
+        """Every scenario in display order."""
+        return [self.get(sid) for sid in self._ids]
+
+    def fingerprint(self) -> str:
+        """Fingerprint of the directory this store was loaded from."""
+        return directory_fingerprint(self.directory)
+
+
+def scenario_directory() -> Path:
+    """Configured scenario directory (SCENARIO_DIR or the bundled data)."""
+    return Path(os.getenv("SCENARIO_DIR") or DEFAULT_SCENARIO_DIR)
+
+
+def directory_fingerprint(directory: Path) -> str:
+    """
+    Cheap identity of a scenario directory's contents (names, sizes, mtimes),
+    used to tell whether a running registry is out of date.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(directory).glob("*.json")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
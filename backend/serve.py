@@ -0,0 +1,214 @@
+"""
+Pre-fork production launcher.
+
+Loads the app once, compiles every scenario and pre-renders (and
+pre-compresses) the scenario payloads, freezes the heap out of the
+garbage collector's reach, then forks WEB_CONCURRENCY uvicorn workers
+that accept on one shared socket. Compiled graphs, answer keys and
+payload bytes are shared copy-on-write, so adding workers adds their
+request-handling memory, not another copy of the scenario set.
+
+The parent only supervises: it restarts workers that die, stops them
+all on SIGTERM or SIGINT, and on SIGHUP reloads its own scenario set
+before forwarding the signal to every worker, so workers forked later
+start from the new set. A worker whose inherited set no longer matches
+the scenario files (e.g. after a reload triggered by its own
+SCENARIO_WATCH_INTERVAL watcher) reloads before it starts serving.
+
+Everything opened on first use - the results store, class analytics,
+the mail queue, the grading executor, /metrics histograms and the
+profiler - is per worker. Stored sessions and class analytics come from
+the shared database and cover every worker; /metrics and the profiler
+cover only their own worker, and digests batch their own worker's sessions.
+
+Usage:
+    python serve.py                          # WEB_CONCURRENCY workers on $PORT
+    python serve.py --workers 4 --port 8000
+    python serve.py --no-preload             # each worker imports the app itself
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+import uvicorn
+
+# A worker that exits sooner than this after starting is restarted with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def preload_app():
+    """
+    Import the app and build everything the workers can share, then move
+    it into the GC's permanent generation so collections in the workers
+    never write to (and so never copy) the shared pages.
+    """
+    import main
+
+    started = time.perf_counter()
+    registry = main.get_registry().warm_up()
+    _share(registry)
+    print(
+        f"Preloaded {len(registry)} scenario(s) in {time.perf_counter() - started:.2f}s "
+        f"({gc.get_freeze_count():,} objects frozen)"
+    )
+    return main.app
+
+
+def _share(registry) -> None:
+    """Freeze the warmed-up registry (payloads already compressed) before forking."""
+    gc.collect()
+    gc.freeze()
+
+
+def reload_preloaded() -> None:
+    """Reload the parent's scenario set so workers forked from now on share it."""
+    import main
+
+    _share(main.reload_scenarios())
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket shared by every worker."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, app, host: str, port: int) -> None:
+    """Serve requests in a forked worker; never returns."""
+    status = 0
+    try:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+
+        if app is None:
+            from main import app
+        else:
+            from main import get_registry, reload_scenarios
+            from reloader import install_sighup_handler
+            install_sighup_handler(reload_scenarios)
+            if get_registry().is_stale():
+                reload_scenarios()
+
+        config = uvicorn.Config(app, host=host, port=port)
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+class Supervisor:
+    """Forks the workers and keeps the configured number of them running."""
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        app,
+        workers: int,
+        host: str,
+        port: int,
+        reload: Optional[Callable[[], None]] = None
+    ):
+        self.sock = sock
+        self.app = app
+        self.reload = reload
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.stopping = False
+        self._pids: Dict[int, float] = {}  # pid -> start time
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.sock, self.app, self.host, self.port)
+        self._pids[pid] = time.monotonic()
+
+    def signal_workers(self, signum: int) -> None:
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        self.signal_workers(signal.SIGTERM)
+
+    def _reload(self, signum, frame) -> None:
+        if self.reload is not None:
+            try:
+                self.reload()
+            except Exception as e:
+                # Workers keep serving their current set; they try the reload too
+                print(f"Scenario reload failed: {e}")
+        self.signal_workers(signal.SIGHUP)
+
+    def run(self) -> int:
+        for _ in range(self.workers):
+            self.spawn()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._reload)
+        print(f"Serving on http://{self.host}:{self.port} with {self.workers} worker(s)")
+
+        while self._pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self._pids.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            if not self.stopping:
+                self.spawn()
+        return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked uvicorn workers.")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1,
+                        help="Worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        default=_env_flag("PRELOAD", True),
+                        help="Import the app in each worker instead of once before forking")
+    args = parser.parse_args(argv)
+
+    sock = bind_socket(args.host, args.port)
+    app = preload_app() if args.preload else None
+    reload = reload_preloaded if args.preload else None
+    return Supervisor(sock, app, max(args.workers, 1), args.host, args.port, reload).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
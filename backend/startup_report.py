@@ -0,0 +1,100 @@
+"""
+Cold-start timing report.
+
+Measures each startup phase in fresh interpreter processes and prints where
+the milliseconds go: framework imports, the lazy path a serverless cold
+start takes (one scenario file), loading and compiling the whole scenario
+set, payload compression and app setup.
+
+Usage:
+    python startup_report.py            # median of 5 cold runs
+    python startup_report.py --runs 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+
+def _measure_phases() -> dict:
+    """Run every startup phase once in this (fresh) process."""
+    timings = {}
+
+    def phase(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[name] = (time.perf_counter() - started) * 1000
+        return result
+
+    phase("import fastapi", lambda: __import__("fastapi"))
+    phase("import dotenv", lambda: __import__("dotenv"))
+    try:
+        phase("import mangum", lambda: __import__("mangum"))
+    except ImportError:
+        pass
+    phase("import models + grading", lambda: (__import__("models"), __import__("grading")))
+    phase("import registry + payloads", lambda: (__import__("registry"), __import__("payloads")))
+
+    from scenario_store import ScenarioStore
+    from registry import ScenarioRegistry, build_registry
+
+    # What LAZY_INIT serves the first /api/scenario/{id} request with
+    lazy = phase("lazy registry + first scenario",
+                 lambda: build_registry().get(ScenarioStore().ids()[0]))
+    phase("render first scenario payload", lambda: lazy.payload.gzip)
+
+    store = phase("scan scenario store", ScenarioStore)
+    scenarios = phase("load scenario files (validated)", store.load_all)
+    registry = phase("compile registry", lambda: ScenarioRegistry(scenarios))
+    phase("render payloads", lambda: registry.payload)
+    phase("precompress payloads", registry.precompress)
+
+    # App construction only; scenarios were measured above
+    os.environ["LAZY_INIT"] = "1"
+    phase("import main (app setup)", lambda: __import__("main"))
+    return timings
+
+
+def _run_child() -> dict:
+    output = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start phases.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to measure")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(BACKEND_DIR))
+        print(json.dumps(_measure_phases()))
+        return
+
+    runs = [_run_child() for _ in range(args.runs)]
+    report = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+    if args.json:
+        print(json.dumps({"runs": args.runs, "median_ms": report}, indent=2))
+        return
+
+    print(f"Cold-start phases (median of {args.runs} fresh processes, milliseconds)")
+    print("-" * 52)
+    for name, ms in report.items():
+        print(f"{name:<36}{ms:>12.2f}")
+    print("-" * 52)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Seeded synthetic scenario generator for load and scaling tests.
+
+Builds valid Scenario objects shaped like manuscript stemmata: a spine of
+the requested depth below the event, random attachment of the remaining
+witnesses (bounded by the branching factor), optional cross-links that
+turn the tree into a DAG (contamination), and a configurable share of lost
+intermediaries. The same seed always produces the same scenario.
+
+Usage:
+    python synthetic.py --nodes 300 --count 5 --out-dir /tmp/synthetic
+    SCENARIO_DIR=/tmp/synthetic uvicorn main:app
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import Edge, Event, Scenario, SourceNode, Topic, TransmissionStep
+
+AUTHOR_ROLES = [
+    "eyewitness chronicler", "monastic scribe", "court annalist",
+    "hagiographer", "compiler", "copyist", "later historian", "modern historian",
+]
+EDGE_KINDS = ["eyewitness", "copy", "summary", "compilation", "translation", "derivative"]
+TRANSMISSION_TYPES = ["copy", "summary", "translation", "compilation"]
+
+
+def generate_synthetic_scenario(
+    seed: int = 0,
+    node_count: int = 100,
+    branching: int = 3,
+    lost_ratio: float = 0.3,
+    depth: int = 6,
+    topic_count: int = 3,
+    cross_link_ratio: float = 0.1,
+    scenario_id: Optional[str] = None,
+) -> Scenario:
+    """
+    Generate one synthetic scenario.
+
+    Args:
+        seed: random seed; equal arguments give an identical scenario
+        node_count: number of source nodes (extant and lost)
+        branching: maximum number of direct copies/derivatives per node
+        lost_ratio: probability that a node is lost (at least one stays extant)
+        depth: maximum transmission depth below the event
+        topic_count: number of topics; the first is always anchored on the event
+        cross_link_ratio: extra DAG edges per node, linking earlier layers to later ones
+        scenario_id: defaults to synthetic_<node_count>_<seed>
+
+    Raises:
+        ValueError: if the parameters cannot produce a valid scenario
+    """
+    if node_count < 1 or branching < 1 or depth < 1 or topic_count < 1:
+        raise ValueError("node_count, branching, depth and topic_count must be positive")
+    if not 0 <= lost_ratio < 1:
+        raise ValueError("lost_ratio must be in [0, 1)")
+    capacity = sum(branching ** layer for layer in range(1, depth + 1))
+    if node_count > capacity:
+        raise ValueError(f"{node_count} nodes do not fit in depth {depth} with branching {branching}")
+
+    rng = random.Random(seed)
+    event_year = rng.randint(450, 900)
+    event = Event(
+        id="evt_synthetic",
+        title=f"Synthetic event {seed}",
+        year=event_year,
+        place="Synthetic realm",
+        description="Procedurally generated event for load testing.",
+    )
+
+    # Per-node attributes, indexed 0..node_count-1; the event is parent -1
+    layers: List[int] = []
+    years: List[int] = []
+    parents: List[int] = []
+    children: Dict[int, int] = {-1: 0}
+
+    def add_node(parent: int) -> None:
+        index = len(layers)
+        parent_layer = layers[parent] if parent >= 0 else 0
+        parent_year = years[parent] if parent >= 0 else event_year
+        layers.append(parent_layer + 1)
+        years.append(parent_year + rng.randint(0, 80))
+        parents.append(parent)
+        children[parent] = children.get(parent, 0) + 1
+        children[index] = 0
+
+    # A spine guarantees the requested depth, then the rest attach randomly
+    for layer in range(min(depth, node_count)):
+        add_node(layer - 1)
+
+    open_parents = [p for p in children if children[p] < branching and (p < 0 or layers[p] < depth)]
+    while len(layers) < node_count:
+        slot = rng.randrange(len(open_parents))
+        parent = open_parents[slot]
+        add_node(parent)
+        if children[parent] >= branching:
+            open_parents[slot] = open_parents[-1]
+            open_parents.pop()
+        if layers[-1] < depth:
+            open_parents.append(len(layers) - 1)
+
+    extant = [rng.random() >= lost_ratio for _ in range(node_count)]
+    if not any(extant):
+        extant[rng.randrange(node_count)] = True
+
+    ids = [f"w{i}" if extant[i] else f"lost_{i}" for i in range(node_count)]
+
+    edges = [
+        Edge(from_id=ids[p] if p >= 0 else event.id, to=ids[i], kind=rng.choice(EDGE_KINDS))
+        for i, p in enumerate(parents)
+    ]
+
+    # Contamination: link an earlier-layer node into a later one
+    linked = {(parents[i], i) for i in range(node_count)}
+    for _ in range(int(cross_link_ratio * node_count)):
+        target = rng.randrange(node_count)
+        candidates = [i for i in range(node_count) if layers[i] < layers[target] and (i, target) not in linked]
+        if not candidates:
+            continue
+        source = rng.choice(candidates)
+        linked.add((source, target))
+        edges.append(Edge(from_id=ids[source], to=ids[target], kind="contamination"))
+
+    nodes = []
+    for i in range(node_count):
+        # Lost ancestors between this node and its nearest extant ancestor
+        transmission = []
+        ancestor = parents[i]
+        while ancestor >= 0 and not extant[ancestor]:
+            transmission.append(TransmissionStep(
+                via=f"lost: witness {ancestor}",
+                year=years[ancestor],
+                type=rng.choice(TRANSMISSION_TYPES),
+            ))
+            ancestor = parents[ancestor]
+
+        nodes.append(SourceNode(
+            id=ids[i],
+            type="text" if rng.random() < 0.9 else "artifact",
+            title=f"{'Witness' if extant[i] else 'Lost witness'} {i}",
+            author_role=rng.choice(AUTHOR_ROLES),
+            year=years[i],
+            extant=extant[i],
+            transmission=list(reversed(transmission)),
+        ))
+
+    extant_ids = [ids[i] for i in range(node_count) if extant[i]]
+    anchors = rng.sample(extant_ids, min(topic_count - 1, len(extant_ids)))
+    topics = [Topic(id="t_event", label=f"{event.title} ({event_year} CE)", anchor=event.id)]
+    topics += [Topic(id=f"t_{anchor}", label=f"Reception in {anchor}", anchor=anchor) for anchor in anchors]
+
+    return Scenario(
+        id=scenario_id or f"synthetic_{node_count}_{seed}",
+        event=event,
+        nodes=nodes,
+        edges=edges,
+        topics=topics,
+        difficulty="hard",
+    )
+
+
+def generate_synthetic_scenarios(count: int, seed: int = 0, **kwargs) -> List[Scenario]:
+    """Generate count scenarios with consecutive seeds."""
+    return [generate_synthetic_scenario(seed=seed + i, **kwargs) for i in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic scenarios as store files.")
+    parser.add_argument("--out-dir", required=True, help="Directory to write <scenario_id>.json files")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--branching", type=int, default=3)
+    parser.add_argument("--lost-ratio", type=float, default=0.3)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--topics", type=int, default=3)
+    parser.add_argument("--cross-links", type=float, default=0.1)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    scenarios = generate_synthetic_scenarios(
+        args.count,
+        seed=args.seed,
+        node_count=args.nodes,
+        branching=args.branching,
+        lost_ratio=args.lost_ratio,
+        depth=args.depth,
+        topic_count=args.topics,
+        cross_link_ratio=args.cross_links,
+    )
+    for scenario in scenarios:
+        path = out_dir / f"{scenario.id}.json"
+        path.write_text(
+            json.dumps(scenario.model_dump(mode="json", by_alias=True), ensure_ascii=False, indent=2),
+            encoding="utf-8"
+        )
+    print(f"Wrote {len(scenarios)} scenario(s) to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Tests for class analytics over a results store shared by several processes.
+Run with: python -m pytest test_analytics.py
+"""
+
+from analytics import ClassAnalytics
+from results_store import SQLiteResultStore
+from test_results_store import _record
+
+
+def test_analytics_include_sessions_stored_by_another_worker(tmp_path):
+    path = str(tmp_path / "results.db")
+    # Two stores on one database stand in for two serve.py workers
+    ours, theirs = SQLiteResultStore(path, page_size=7), SQLiteResultStore(path)
+    try:
+        for i in range(10):
+            ours.record_session(_record(i))
+        analytics = ClassAnalytics.from_store(ours)
+        assert analytics.overview()["sessions"] == 10
+
+        for i in range(10, 25):
+            theirs.record_session(_record(i))
+        theirs.flush()
+        for i in range(25, 30):
+            ours.record_session(_record(i))
+
+        overview = analytics.overview()
+        assert overview["sessions"] == 30
+        assert overview["scenarios"]["scenario_1"]["results"] == 30
+        assert overview["scenarios"]["scenario_1"]["error_rate"] == 0.5
+        nodes = {n["node_id"]: n for n in analytics.scenario_detail("scenario_1")["nodes"]}
+        assert nodes["b"]["graded"] == 30 and nodes["b"]["errors"] == 30
+    finally:
+        ours.close()
+        theirs.close()
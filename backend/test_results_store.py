@@ -0,0 +1,121 @@
+"""
+Tests for the results store's streamed reads and failed-write handling.
+Run with: python -m pytest test_results_store.py
+"""
+
+import io
+import random
+import sqlite3
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from export import stream_export
+from models import GradingResult, ScenarioResult
+from results_store import SQLiteResultStore, SessionRecord
+
+SESSIONS = 120
+
+
+def _record(i: int) -> SessionRecord:
+    return SessionRecord(
+        verification_code=f"CODE{i:06d}",
+        student_name=f"Student {i}",
+        student_email=None,
+        submitted_at=f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}",
+        total_score=1,
+        max_score=2,
+        percentage=50.0,
+        scenario_results=[
+            ScenarioResult(
+                scenario_id="scenario_1",
+                score=1,
+                max_score=2,
+                topic_label="Topic",
+                topic_id="topic_1",
+                results=[
+                    GradingResult(node_id="a", student_answer="primary", correct_answer="primary",
+                                  is_correct=True, points=1, feedback="Correct"),
+                    GradingResult(node_id="b", student_answer="primary", correct_answer="secondary",
+                                  is_correct=False, points=0, feedback="Incorrect"),
+                ],
+            )
+        ],
+    )
+
+
+def _store(tmp_path) -> SQLiteResultStore:
+    store = SQLiteResultStore(str(tmp_path / "results.db"), page_size=25)
+    for i in range(SESSIONS):
+        store.record_session(_record(i))
+    store.flush()
+    return store
+
+
+def _advance_from_two_threads(iterator) -> list:
+    """
+    Drain an iterator, calling next() on either of two threads at random,
+    as StreamingResponse's thread pool can.
+    """
+    threads = [ThreadPoolExecutor(max_workers=1) for _ in range(2)]
+    pick = random.Random(0)
+    items = []
+    try:
+        while True:
+            item = threads[pick.randrange(2)].submit(next, iterator, None).result()
+            if item is None:
+                return items
+            items.append(item)
+    finally:
+        for thread in threads:
+            thread.shutdown()
+
+
+def test_iter_sessions_across_threads(tmp_path):
+    store = _store(tmp_path)
+    try:
+        sessions = _advance_from_two_threads(store.iter_sessions())
+    finally:
+        store.close()
+
+    assert [s["verification_code"] for s in sessions] == [f"CODE{i:06d}" for i in range(SESSIONS)]
+    assert all(len(s["scenario_results"][0]["results"]) == 2 for s in sessions)
+
+
+def test_export_across_threads(tmp_path):
+    store = _store(tmp_path)
+    try:
+        archive = b"".join(_advance_from_two_threads(stream_export(store, "zip")))
+    finally:
+        store.close()
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+    # Three reports per session plus summary.csv
+    assert len(names) == SESSIONS * 3 + 1
+
+
+def test_failed_batch_is_spilled_and_requeued(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = SQLiteResultStore(path, write_attempts=2, retry_delay=0.01)
+    attempts = []
+
+    def locked(records):
+        attempts.append(len(records))
+        raise sqlite3.OperationalError("database is locked")
+
+    store._write = locked
+    store.record_session(_record(0))
+    store.flush()
+    store.close()
+    assert attempts == [1, 1]
+    assert len(list(store.spill_dir.glob("*.json"))) == 1
+
+    reopened = SQLiteResultStore(path)
+    try:
+        reopened.flush()
+        session = reopened.get_session("CODE000000")
+    finally:
+        reopened.close()
+    assert session["scenario_results"][0]["results"][1]["is_correct"] is False
+    assert not list(reopened.spill_dir.glob("*.json"))
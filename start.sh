@@ -26,8 +26,8 @@ fi
 source venv/bin/activate
 pip install -q -r requirements.txt
 
-# Start backend in background
-python main.py &
+# Start backend in background (restarts on code changes)
+RELOAD=1 python main.py &
 BACKEND_PID=$!
 echo "✅ Backend started (PID: $BACKEND_PID) on http://localhost:8000"
 